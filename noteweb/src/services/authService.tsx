@@ -3,6 +3,10 @@ import type { User } from "../types/User";
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
+// Après une écriture, l'API renvoie cet en-tête : le renvoyer garde nos lectures
+// sur la base primaire le temps que le réplica rattrape (voir server/services/replica.py)
+const PRIMARY_UNTIL_HEADER = "X-DB-Primary-Until";
+
 export const authService = {
 
   async register(userData: RegisterData): Promise<{ message: string }> {
@@ -11,6 +15,7 @@ export const authService = {
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify(userData),
     });
+    this.rememberPrimaryUntil(response);
 
     const data = await response.json();
 
@@ -69,4 +74,16 @@ export const authService = {
   getToken(): string | null {
     return localStorage.getItem("token");
   },
+
+  rememberPrimaryUntil(response: Response): void {
+    const until = response.headers.get(PRIMARY_UNTIL_HEADER);
+    if (until) {
+      sessionStorage.setItem("dbPrimaryUntil", until);
+    }
+  },
+
+  primaryUntilHeader(): Record<string, string> {
+    const until = sessionStorage.getItem("dbPrimaryUntil");
+    return until ? { [PRIMARY_UNTIL_HEADER]: until } : {};
+  },
 };
@@ -11,9 +11,16 @@ class TaskService {
     return {
       "Content-Type": "application/json",
       ...(token && { Authorization: `Bearer ${token}` }),
+      ...authService.primaryUntilHeader(),
     };
   }
 
+  private async send(url: string, init: RequestInit): Promise<Response> {
+    const response = await fetch(url, init);
+    authService.rememberPrimaryUntil(response);
+    return response;
+  }
+
   logout() {
     authService.logout();
   }
@@ -45,7 +52,7 @@ class TaskService {
     try {
       console.log("🔄 Envoi création utilisateur...", userData);
 
-      const response = await fetch(`${API_URL}/auth/admin/create-user`, {
+      const response = await this.send(`${API_URL}/auth/admin/create-user`, {
         method: "POST",
         headers: this.getHeaders(),
         body: JSON.stringify(userData),
@@ -92,7 +99,7 @@ class TaskService {
   }
 
   async updateTaskStatus(taskId: number, status: string): Promise<Task> {
-    const response = await fetch(`${API_URL}/api/user/tasks/${taskId}/status`, {
+    const response = await this.send(`${API_URL}/api/user/tasks/${taskId}/status`, {
       method: "PUT",
       headers: this.getHeaders(),
       body: JSON.stringify({ statut: status }),
@@ -105,7 +112,7 @@ class TaskService {
   }
 
   async submitTaskNote(taskId: number, note: string): Promise<Task> {
-    const response = await fetch(`${API_URL}/api/user/tasks/${taskId}/note`, {
+    const response = await this.send(`${API_URL}/api/user/tasks/${taskId}/note`, {
       method: "PUT",
       headers: this.getHeaders(),
       body: JSON.stringify({ note_utilisateur: note }),
@@ -131,7 +138,7 @@ class TaskService {
   }
 
   async createTask(data: { user_id: number; titre: string; description: string }): Promise<Task> {
-    const response = await fetch(`${API_URL}/api/admin/tasks`, {
+    const response = await this.send(`${API_URL}/api/admin/tasks`, {
       method: "POST",
       headers: this.getHeaders(),
       body: JSON.stringify(data),
@@ -155,7 +162,7 @@ class TaskService {
   }
 
   async updateTask(taskId: number, data: Partial<Task>): Promise<Task> {
-    const response = await fetch(`${API_URL}/api/admin/tasks/${taskId}`, {
+    const response = await this.send(`${API_URL}/api/admin/tasks/${taskId}`, {
       method: "PUT",
       headers: this.getHeaders(),
       body: JSON.stringify(data),
@@ -168,7 +175,7 @@ class TaskService {
   }
 
   async validateTask(taskId: number): Promise<Task> {
-    const response = await fetch(`${API_URL}/api/admin/tasks/${taskId}/validate`, {
+    const response = await this.send(`${API_URL}/api/admin/tasks/${taskId}/validate`, {
       method: "PUT",
       headers: this.getHeaders(),
     });
@@ -180,7 +187,7 @@ class TaskService {
   }
 
   async deleteTask(taskId: number): Promise<void> {
-    const response = await fetch(`${API_URL}/api/admin/tasks/${taskId}`, {
+    const response = await this.send(`${API_URL}/api/admin/tasks/${taskId}`, {
       method: "DELETE",
       headers: this.getHeaders(),
     });
@@ -1,23 +1,54 @@
 import os
+import click
 from flask import Flask
 from config import Config
-from extensions import db, bcrypt, migrate, jwt, cors
+import commands
+from extensions import db, bcrypt, init_migrate, jwt, cors
 from routes.auth_routes import auth_bp
 from routes.task_routes import task_bp
 from models.role import Role
 from models.user import User
 from models.task import Task
-from routes.auth_routes import token_blacklist
+from models.token_blocklist import RevokedToken
+from models.task_event import TaskEvent
+from models.task_tombstone import TaskTombstone
+from models.task_counter import TaskCounter
+from models.task_archive import TaskArchive
+from services import (
+    db_pool, events, identity, metrics, query_budget, replica, structured_logging, token_blocklist, warmup
+)
+from services.passwords import password_hasher
+from utils import compression, json_provider
 
 
-def create_app():
+def create_app(config_overrides=None):
     app = Flask(__name__)
     app.config.from_object(Config)
+    # Permet aux scripts (diagnostic, benchmarks) de pointer vers une autre base
+    if config_overrides:
+        app.config.update(config_overrides)
 
+    # En premier : request_id disponible pour tous les hooks, durée journalisée complète
+    structured_logging.init_app(app)
+    json_provider.init_app(app)
+    # Avant la compression : la taille mesurée est celle envoyée
+    metrics.init_app(app)
+    query_budget.init_app(app)
+    compression.init_app(app)
+    db_pool.init_app(app)
+    replica.init_app(app)
     db.init_app(app)
-    migrate.init_app(app, db)
+    # `flask db ...` : hors de la commande flask (gunicorn, scripts), Alembic n'est pas importé
+    if click.get_current_context(silent=True) is not None:
+        init_migrate(app)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
     jwt.init_app(app)
+    identity.init_app(app)
+    token_blocklist.init_app(app)
+    events.init_app(app)
+    commands.init_app(app)
+    warmup.init_app(app)
     
     frontend_url = os.environ.get("FRONTEND_URL", "http://localhost:5173")
     
@@ -25,15 +56,15 @@ def create_app():
         r"/*": {
             "origins": [frontend_url, "http://localhost:5173", "http://127.0.0.1:5173"],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
+            "allow_headers": ["Content-Type", "Authorization", "X-DB-Primary-Until"],
+            "expose_headers": ["X-Total-Count", "X-Request-ID", "X-DB-Primary-Until"],
             "supports_credentials": True
         }
     })
 
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
-        jti = jwt_payload["jti"]
-        return jti in token_blacklist
+        return token_blocklist.is_token_revoked(jwt_payload)
 
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(task_bp, url_prefix="/api")
@@ -0,0 +1,318 @@
+"""Charge mixte reproductible sur l'API : débit et p50/p95/p99 par endpoint.
+
+L'application est créée par create_app() sur une base remplie comme par
+`flask seed` (services/seed.py) : SQLite temporaire, plus
+BENCH_POSTGRES_URL si défini, ou --url. Elle est servie en local par un
+serveur multi-thread. --concurrency clients
+virtuels jouent chacun un scénario pendant --duration secondes, avec un
+générateur aléatoire initialisé par --seed :
+
+- "login"     : rafales de POST /auth/login ;
+- "dashboard" : utilisateurs qui interrogent /api/user/tasks (avec
+  If-None-Match) et font avancer leurs tâches ;
+- "admin"     : admins qui listent les tâches, les statistiques, et
+  valident les tâches terminées ;
+- "mixed"     : les trois à la fois (répartition de --admins admins).
+
+La base est recréée avant chaque scénario. Les résultats (JSON, --out)
+peuvent être comparés avec --compare avant.json apres.json.
+
+Utilisation (depuis server/) :
+    python -m bench.api_bench --duration 20 --concurrency 16 --out avant.json
+    python -m bench.api_bench --compare avant.json apres.json
+
+ATTENTION : avec --url, utiliser une base jetable, les tables sont recréées.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+
+from app import create_app
+from bench.common import print_table, request, serve, summarize
+from extensions import db
+from models.task import Task
+from services.seed import seed_data
+
+PASSWORD = "bench-password"
+DOMAIN = "bench.local"
+
+# Poids des actions de chaque rôle ; "login" joue aussi le rôle de rafale
+MIXES = {
+    "login": {"login": 1},
+    "user": {"user_tasks": 10, "user_status": 2, "user_profile": 1, "login": 1},
+    "admin": {"admin_tasks": 4, "admin_validate": 2, "admin_stats": 1, "admin_users": 1},
+}
+
+# Scénario -> rôle de chaque client virtuel ("mixed" : voir client_roles)
+SCENARIOS = ("login", "dashboard", "admin", "mixed")
+
+
+def seed(app, users, tasks_per_user):
+    """Schéma neuf et jeu de données de `flask seed` ; renvoie le dialecte et les tâches terminées"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_data(users, users * tasks_per_user, password=PASSWORD, domain=DOMAIN)
+        done = db.session.scalars(select(Task.id).where(Task.statut == "terminé")).all()
+        return db.engine.dialect.name, done
+
+
+class Recorder:
+    """Durées et statuts par endpoint, partagés entre les clients"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.recording = False
+
+    def record(self, endpoint, status, ms):
+        if not self.recording:
+            return
+        with self._lock:
+            self.statuses[endpoint][status] += 1
+            if status < 400:
+                self.latencies[endpoint].append(ms)
+
+    def results(self, elapsed):
+        results = {}
+        for endpoint in sorted(self.statuses):
+            statuses = self.statuses[endpoint]
+            results[endpoint] = {
+                **summarize(self.latencies[endpoint], elapsed),
+                "errors": sum(n for status, n in statuses.items() if status >= 400),
+                "statuses": {str(status): n for status, n in sorted(statuses.items())},
+            }
+        return results
+
+
+class Client:
+    """Client virtuel : un compte, un jeton, un ETag de liste"""
+
+    def __init__(self, base_url, role, email, rng, recorder, to_validate):
+        self.base_url = base_url
+        self.role = role
+        self.email = email
+        self.rng = rng
+        self.recorder = recorder
+        self.to_validate = to_validate
+        self.token = None
+        self.etag = None
+        self.open_tasks = []
+
+    def call(self, endpoint, method, path, body=None, headers=None, auth=True):
+        headers = dict(headers or {})
+        if auth:
+            headers["Authorization"] = f"Bearer {self.token}"
+        try:
+            status, payload, response_headers, ms = request(method, self.base_url + path, body, headers)
+        except OSError:
+            status, payload, response_headers, ms = 599, b"", {}, 0.0
+        self.recorder.record(endpoint, status, ms)
+        return status, payload, response_headers
+
+    def login(self):
+        status, payload, _ = self.call("POST /auth/login", "POST", "/auth/login",
+                                       {"email": self.email, "password": PASSWORD}, auth=False)
+        if status == 200:
+            self.token = json.loads(payload)["token"]
+
+    def user_tasks(self):
+        headers = {"If-None-Match": self.etag} if self.etag else None
+        status, payload, response_headers = self.call("GET /api/user/tasks", "GET", "/api/user/tasks",
+                                                      headers=headers)
+        if status == 200:
+            self.etag = response_headers.get("ETag")
+            self.open_tasks = [t["id"] for t in json.loads(payload) if t["statut"] in ("à faire", "en cours")]
+
+    def user_status(self):
+        if not self.open_tasks:
+            return self.user_tasks()
+        task_id = self.open_tasks.pop(self.rng.randrange(len(self.open_tasks)))
+        status, _, _ = self.call("PUT /api/user/tasks/<id>/status", "PUT", f"/api/user/tasks/{task_id}/status",
+                                 {"statut": "terminé"})
+        if status == 200:
+            self.to_validate.append(task_id)
+
+    def user_profile(self):
+        self.call("GET /api/user/profile", "GET", "/api/user/profile")
+
+    def admin_tasks(self):
+        self.call("GET /api/admin/tasks?limit=50", "GET", "/api/admin/tasks?limit=50")
+
+    def admin_validate(self):
+        try:
+            task_id = self.to_validate.popleft()
+        except IndexError:
+            return self.admin_tasks()
+        self.call("PUT /api/admin/tasks/<id>/validate", "PUT", f"/api/admin/tasks/{task_id}/validate")
+
+    def admin_stats(self):
+        self.call("GET /api/admin/stats", "GET", "/api/admin/stats")
+
+    def admin_users(self):
+        self.call("GET /api/admin/users", "GET", "/api/admin/users")
+
+    def run(self, deadline):
+        actions, weights = zip(*MIXES[self.role].items())
+        if self.role != "login":
+            self.login()
+        while time.monotonic() < deadline:
+            getattr(self, self.rng.choices(actions, weights)[0])()
+
+
+def client_roles(scenario, concurrency, admins):
+    if scenario == "login":
+        return ["login"] * concurrency
+    if scenario == "dashboard":
+        return ["user"] * concurrency
+    if scenario == "admin":
+        return ["admin"] * concurrency
+    admins = min(admins, concurrency)
+    return ["admin"] * admins + ["user"] * (concurrency - admins)
+
+
+def run_scenario(scenario, database_url, args):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": database_url, "BCRYPT_LOG_ROUNDS": args.rounds})
+    dialect, done = seed(app, args.users, args.tasks_per_user)
+    recorder = Recorder()
+    to_validate = deque(done)
+
+    with serve(app) as base_url:
+        clients = []
+        for i, role in enumerate(client_roles(scenario, args.concurrency, args.admins)):
+            email = f"admin0@{DOMAIN}" if role == "admin" else f"user{i % args.users}@{DOMAIN}"
+            clients.append(Client(base_url, role, email, random.Random(args.seed + i), recorder, to_validate))
+
+        deadline = time.monotonic() + args.warmup + args.duration
+        threads = [threading.Thread(target=client.run, args=(deadline,), daemon=True) for client in clients]
+        for thread in threads:
+            thread.start()
+        # Les premières secondes (connexions, caches froids) ne sont pas mesurées
+        time.sleep(args.warmup)
+        recorder.recording = True
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        recorder.recording = False
+
+    with app.app_context():
+        db.engine.dispose()
+    return dialect, {"elapsed_s": elapsed, "endpoints": recorder.results(elapsed)}
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "commit": commit}
+
+
+def print_results(results):
+    for dialect, scenarios in results["runs"].items():
+        for scenario, run in scenarios.items():
+            print_table(f"{dialect} / {scenario} ({run['elapsed_s']:.1f} s)", run["endpoints"])
+            for endpoint, summary in run["endpoints"].items():
+                if summary["errors"]:
+                    print(f"  {endpoint}: {summary['errors']} erreur(s) {summary['statuses']}")
+
+
+def _delta(old, new):
+    if not old or new is None:
+        return f"{'-':>8}"
+    return f"{(new - old) / old * 100:>+7.0f}%"
+
+
+def compare(old_path, new_path):
+    """Affiche les mesures de new_path et leur écart relatif à old_path"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old_path} ({old['environment'].get('commit')}) -> {new_path} ({new['environment'].get('commit')})")
+    for dialect, scenarios in new["runs"].items():
+        for scenario, run in scenarios.items():
+            print(f"\n{dialect} / {scenario}")
+            print(f"{'':<36}{'p50 ms':>10}{'':>8}{'p95 ms':>10}{'':>8}{'p99 ms':>10}{'':>8}{'req/s':>10}{'':>8}")
+            before = old["runs"].get(dialect, {}).get(scenario, {}).get("endpoints", {})
+            for endpoint, s in run["endpoints"].items():
+                b = before.get(endpoint, {})
+                line = f"{endpoint:<36}"
+                for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+                    value = s.get(key)
+                    line += (f"{value:>10.1f}" if value is not None else f"{'-':>10}") + _delta(b.get(key), value)
+                print(line)
+
+
+def database_urls(args):
+    """URLs à mesurer et fichier SQLite temporaire à supprimer (ou None)"""
+    if args.url:
+        return args.url, None
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    tmp.close()
+    urls = [f"sqlite:///{tmp.name}"]
+    if os.environ.get("BENCH_POSTGRES_URL"):
+        urls.append(os.environ["BENCH_POSTGRES_URL"])
+    return urls, tmp.name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", action="append",
+                        help="URL de base (répétable). Par défaut : SQLite temporaire "
+                             "+ BENCH_POSTGRES_URL si défini.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="scénario à jouer (répétable, par défaut tous)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks-per-user", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--admins", type=int, default=2, help="clients admins du scénario mixed")
+    parser.add_argument("--duration", type=float, default=20, help="durée mesurée (secondes)")
+    parser.add_argument("--warmup", type=float, default=2, help="durée non mesurée (secondes)")
+    parser.add_argument("--rounds", type=int, default=int(os.environ.get("BCRYPT_LOG_ROUNDS", 12)))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="fichier JSON de résultats")
+    parser.add_argument("--compare", nargs=2, metavar=("AVANT", "APRES"),
+                        help="compare deux fichiers de résultats sans lancer de mesure")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    urls, tmp_path = database_urls(args)
+    results = {"params": vars(args), "environment": environment(), "runs": {}}
+    for url in urls:
+        for scenario in args.scenario or SCENARIOS:
+            try:
+                dialect, run = run_scenario(scenario, url, args)
+            except Exception as e:
+                print(f"{make_url(url).render_as_string(hide_password=True)} ignorée : {str(e).splitlines()[0]}", file=sys.stderr)
+                break
+            results["runs"].setdefault(dialect, {})[scenario] = run
+
+    print_results(results)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if tmp_path:
+        os.unlink(tmp_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Outils partagés par les benchmarks (serveur local, client HTTP, percentiles)."""
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+from werkzeug.serving import make_server
+
+
+@contextmanager
+def serve(app):
+    """Lance l'application sur un port libre (serveur multi-thread) et renvoie son URL"""
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def request(method, url, body=None, headers=None):
+    """Requête HTTP ; renvoie (statut, corps brut, en-têtes, durée en ms)"""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={
+        "Content-Type": "application/json", **(headers or {})
+    })
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            payload = response.read()
+            status, response_headers = response.status, dict(response.headers)
+    except urllib.error.HTTPError as e:
+        payload = e.read()
+        status, response_headers = e.code, dict(e.headers)
+    return status, payload, response_headers, (time.perf_counter() - start) * 1000
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(latencies_ms, elapsed_s=None):
+    summary = {
+        "count": len(latencies_ms),
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+        "max_ms": max(latencies_ms) if latencies_ms else None,
+    }
+    if elapsed_s:
+        summary["throughput_rps"] = len(latencies_ms) / elapsed_s
+    return summary
+
+
+def print_table(title, rows):
+    """rows : {nom: summarize(...)}"""
+    width = max([28] + [len(name) + 2 for name in rows])
+    print(f"\n{title}")
+    print(f"{'':<{width}}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, s in rows.items():
+        rps = s.get("throughput_rps")
+        print(f"{name:<{width}}{s['count']:>7}"
+              + "".join(f"{s[k]:>10.1f}" if s[k] is not None else f"{'-':>10}" for k in ("p50_ms", "p95_ms", "p99_ms"))
+              + (f"{rps:>10.1f}" if rps else f"{'-':>10}"))
@@ -0,0 +1,151 @@
+"""Coût de l'encodage JSON et gain de la compression sur GET /api/admin/tasks.
+
+Trois mesures sur la même base SQLite :
+- encodage seul de la liste de tâches : encodeur Flask par défaut avec
+  isoformat() par champ (comportement historique), json standard avec
+  dates natives, orjson ;
+- compression du corps obtenu : octets et temps pour gzip et brotli ;
+- requête complète via le client de test, pour chaque backend JSON et
+  chaque Accept-Encoding (sans réseau : le gain en octets s'ajoute au
+  temps mesuré en production).
+
+Utilisation (depuis server/) :
+    python -m bench.encoding_bench --tasks 5000 --repeat 30 --out encoding.json
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+
+from app import create_app
+from bench.common import percentile
+from extensions import db
+from models.role import Role
+from models.task import Task
+from models.user import User
+from services.task_queries import fetch_task_dicts, task_list_select
+from utils import compression, json_provider
+
+
+def seed(app, users, tasks):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        admin_role, user_role = Role(nom="admin"), Role(nom="user")
+        db.session.add_all([admin_role, user_role])
+        db.session.flush()
+        admin = User(nom="Bench", prenom="Admin", email="admin@bench.local", telephone="0000000000",
+                     role_id=admin_role.id)
+        admin.set_password("bench-password")
+        db.session.add(admin)
+        for i in range(users):
+            db.session.add(User(nom=f"Bench{i}", prenom="User", email=f"bench{i}@bench.local",
+                                telephone=f"{i + 1:010d}", password_hash=admin.password_hash,
+                                role_id=user_role.id))
+        db.session.flush()
+        db.session.execute(insert(Task), [
+            {"titre": f"Tâche {i}", "description": "Description de la tâche " * 4,
+             "user_id": admin.id + 1 + i % users, "assigned_by_id": admin.id, "statut": "à faire"}
+            for i in range(tasks)
+        ])
+        db.session.commit()
+
+
+def timed(fn, repeat):
+    """Durées (ms) de repeat appels à fn et dernier résultat"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations, result
+
+
+def legacy_dicts(tasks):
+    # Ancien to_dict : chaque date convertie en chaîne avant l'encodage
+    return [{**task, **{key: task[key].isoformat() if task[key] else None
+                        for key in ("date_validation", "created_at", "updated_at")}} for task in tasks]
+
+
+def encoding_results(app, repeat):
+    with app.app_context():
+        tasks = fetch_task_dicts(task_list_select().order_by(Task.created_at.desc(), Task.id.desc()))
+        providers = {"flask_default": DefaultJSONProvider(app)}
+        providers.update({name: cls(app) for name, cls in json_provider.BACKENDS.items()
+                          if name != "orjson" or json_provider.orjson is not None})
+
+        results = {}
+        for name, provider in providers.items():
+            if name == "flask_default":
+                fn = lambda: provider.dumps(legacy_dicts(tasks))
+            else:
+                fn = lambda: provider.dumps(tasks)
+            durations, body = timed(fn, repeat)
+            results[name] = {"p50_ms": percentile(durations, 50), "bytes": len(body.encode("utf-8"))}
+
+        body = providers["flask_default"].dumps(legacy_dicts(tasks)).encode("utf-8")
+        compressed = {"identity": {"p50_ms": 0.0, "bytes": len(body)}}
+        for name, encoder in compression.ENCODERS.items():
+            durations, data = timed(lambda: encoder(body, app), repeat)
+            compressed[name] = {"p50_ms": percentile(durations, 50), "bytes": len(data)}
+        return len(tasks), results, compressed
+
+
+def request_results(database_url, repeat):
+    results = {}
+    backends = ["stdlib"] + (["orjson"] if json_provider.orjson is not None else [])
+    for backend in backends:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": database_url, "JSON_BACKEND": backend})
+        client = app.test_client()
+        token = client.post("/auth/login", json={"email": "admin@bench.local",
+                                                 "password": "bench-password"}).get_json()["token"]
+        for encoding in ["identity"] + list(compression.ENCODERS):
+            headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": encoding}
+            durations, response = timed(lambda: client.get("/api/admin/tasks", headers=headers), repeat)
+            results[f"{backend} + {encoding}"] = {"p50_ms": percentile(durations, 50),
+                                                  "p95_ms": percentile(durations, 95),
+                                                  "bytes": len(response.data)}
+    return results
+
+
+def print_rows(title, rows):
+    print(f"\n{title}")
+    print(f"{'':<24}{'p50 ms':>10}{'octets':>12}")
+    for name, row in rows.items():
+        print(f"{name:<24}{row['p50_ms']:>10.2f}{row['bytes']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'encodage JSON et de la compression")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--out", help="fichier JSON de résultats")
+    args = parser.parse_args()
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    tmp.close()
+    database_url = f"sqlite:///{tmp.name}"
+    # BCRYPT_LOG_ROUNDS bas : seul le hachage de l'admin du seed, sans intérêt ici
+    app = create_app({"SQLALCHEMY_DATABASE_URI": database_url, "BCRYPT_LOG_ROUNDS": 4})
+    seed(app, args.users, args.tasks)
+
+    count, encoding, compressed = encoding_results(app, args.repeat)
+    print_rows(f"Encodage de {count} tâches", encoding)
+    print_rows("Compression du corps", compressed)
+    requests = request_results(database_url, args.repeat)
+    print_rows("GET /api/admin/tasks (client de test)", requests)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"params": vars(args), "encoding": encoding, "compression": compressed,
+                       "requests": requests}, f, indent=2)
+    os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Latence de /auth/login sous charge concurrente, avant/après le pool bcrypt.
+
+Deux scénarios sont joués sur la même base SQLite :
+- "inline" : PASSWORD_HASH_WORKERS=0, bcrypt tourne dans chaque thread de requête
+  (comportement historique) ;
+- "pool"   : pool bcrypt borné (valeurs de config.py ou --workers).
+
+Pendant la rafale de connexions, un client interroge /api/user/tasks en
+continu pour mesurer l'effet sur les autres routes.
+
+Utilisation (depuis server/) :
+    python -m bench.login_bench --logins 200 --concurrency 32 --out login.json
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from bench.common import print_table, request, serve, summarize
+from extensions import bcrypt, db
+from models.role import Role
+from models.task import Task
+from models.user import User
+
+PASSWORD = "bench-password"
+
+
+def seed(app, users, rounds):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        role = Role(nom="user")
+        db.session.add(role)
+        db.session.flush()
+        # Un seul hachage réutilisé : le seed ne doit pas dominer le temps du bench
+        password_hash = bcrypt.generate_password_hash(PASSWORD, rounds).decode("utf-8")
+        for i in range(users):
+            db.session.add(User(nom=f"Bench{i}", prenom="Login", email=f"bench{i}@bench.local",
+                                telephone=f"{i:010d}", password_hash=password_hash, role_id=role.id))
+        db.session.flush()
+        for i in range(users * 5):
+            db.session.add(Task(titre=f"Tâche {i}", user_id=(i % users) + 1, statut="à faire"))
+        db.session.commit()
+
+
+def run_scenario(name, overrides, args, database_url):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": database_url, **overrides})
+    seed(app, args.users, args.rounds)
+
+    with serve(app) as base_url:
+        status, body, _, _ = request("POST", f"{base_url}/auth/login",
+                                     {"email": "bench0@bench.local", "password": PASSWORD})
+        token = json.loads(body)["token"]
+
+        stop = threading.Event()
+        poll_latencies = []
+
+        def poll():
+            while not stop.is_set():
+                _, _, _, ms = request("GET", f"{base_url}/api/user/tasks",
+                                      headers={"Authorization": f"Bearer {token}"})
+                poll_latencies.append(ms)
+
+        def login(i):
+            status, _, _, ms = request("POST", f"{base_url}/auth/login", {
+                "email": f"bench{i % args.users}@bench.local", "password": PASSWORD
+            })
+            return status, ms
+
+        poller = threading.Thread(target=poll, daemon=True)
+        poller.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(login, range(args.logins)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        poller.join()
+
+    ok = [ms for status, ms in results if status == 200]
+    rejected = sum(1 for status, _ in results if status == 503)
+    return {
+        "login": summarize(ok, elapsed),
+        "login_rejected_503": rejected,
+        "user_tasks_during_burst": summarize(poll_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de /auth/login (bcrypt inline vs pool)")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=int(os.environ.get("BCRYPT_LOG_ROUNDS", 12)))
+    parser.add_argument("--workers", type=int, default=None, help="taille du pool bcrypt (scénario pool)")
+    parser.add_argument("--out", help="fichier JSON de résultats")
+    args = parser.parse_args()
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    tmp.close()
+    database_url = f"sqlite:///{tmp.name}"
+
+    pool_overrides = {"BCRYPT_LOG_ROUNDS": args.rounds}
+    if args.workers is not None:
+        pool_overrides["PASSWORD_HASH_WORKERS"] = args.workers
+    scenarios = {
+        "inline": {"BCRYPT_LOG_ROUNDS": args.rounds, "PASSWORD_HASH_WORKERS": 0},
+        "pool": pool_overrides,
+    }
+
+    results = {"params": vars(args), "scenarios": {}}
+    for name, overrides in scenarios.items():
+        results["scenarios"][name] = run_scenario(name, overrides, args, database_url)
+
+    rows = {}
+    for name, result in results["scenarios"].items():
+        rows[f"{name} /auth/login"] = result["login"]
+        rows[f"{name} /api/user/tasks"] = result["user_tasks_during_burst"]
+    print_table(f"{args.logins} connexions, {args.concurrency} en parallèle, coût bcrypt {args.rounds}", rows)
+    for name, result in results["scenarios"].items():
+        print(f"{name}: {result['login_rejected_503']} connexion(s) refusée(s) en 503")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
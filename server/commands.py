@@ -0,0 +1,81 @@
+"""Commandes `flask` de l'application (en plus de `flask db` de Flask-Migrate)."""
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+
+from extensions import db
+from services.seed import DEFAULT_PASSWORD, seed_data
+from services.sync import compact_tombstones
+from services.task_archive import archive_tasks, count_archivable, id_conflicts
+
+
+@click.command("seed")
+@click.option("--users", default=100, show_default=True, help="Nombre d'utilisateurs à créer.")
+@click.option("--tasks", default=10000, show_default=True, help="Nombre de tâches à créer.")
+@click.option("--admins", default=1, show_default=True, help="Nombre d'administrateurs à créer.")
+@click.option("--password", default=DEFAULT_PASSWORD, show_default=True, help="Mot de passe de tous les comptes.")
+@click.option("--domain", default="seed.local", show_default=True, help="Domaine des emails générés.")
+@click.option("--days", default=180, show_default=True, help="Période (jours) couverte par les dates de création.")
+@click.option("--seed", "seed_value", default=0, show_default=True, help="Graine du générateur aléatoire.")
+@click.option("--chunk-size", default=10000, show_default=True, help="Lignes par INSERT.")
+@click.option("--reset", is_flag=True, help="Supprime et recrée toutes les tables avant (DESTRUCTIF).")
+def seed_command(users, tasks, admins, password, domain, days, seed_value, chunk_size, reset):
+    """Remplit la base avec des données synthétiques (non interactif)."""
+    if reset:
+        db.drop_all()
+        db.create_all()
+    start = time.perf_counter()
+    try:
+        created = seed_data(users, tasks, admins=admins, password=password, domain=domain, days=days,
+                            seed=seed_value, chunk_size=chunk_size)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    elapsed = time.perf_counter() - start
+    click.echo(f"{created['admins']} admin(s), {created['users']} utilisateur(s), {created['tasks']} tâche(s) "
+               f"créés en {elapsed:.1f} s ({created['tasks'] / elapsed:.0f} tâches/s)")
+    click.echo(f"Comptes : user<n>@{domain} et admin<n>@{domain}, mot de passe « {password} »")
+
+
+@click.command("archive-tasks")
+@click.option("--older-than-days", type=int, help="Âge minimal depuis la validation (défaut : ARCHIVE_AFTER_DAYS).")
+@click.option("--batch-size", type=int, help="Tâches par lot (défaut : ARCHIVE_BATCH_SIZE).")
+@click.option("--max-batches", type=int, help="Nombre maximal de lots (défaut : jusqu'à épuisement).")
+@click.option("--pause", default=0.0, show_default=True, help="Pause (secondes) entre deux lots.")
+@click.option("--dry-run", is_flag=True, help="Compte les tâches à archiver sans rien déplacer.")
+def archive_tasks_command(older_than_days, batch_size, max_batches, pause, dry_run):
+    """Déplace les tâches validées anciennes dans tasks_archive (par lots, relançable)."""
+    config = current_app.config
+    if older_than_days is None:
+        older_than_days = config.get("ARCHIVE_AFTER_DAYS", 90)
+    if batch_size is None:
+        batch_size = config.get("ARCHIVE_BATCH_SIZE", 1000)
+    if older_than_days < 0 or batch_size < 1:
+        raise click.UsageError("--older-than-days doit être positif et --batch-size au moins 1")
+    if dry_run:
+        before = datetime.utcnow() - timedelta(days=older_than_days)
+        click.echo(f"{count_archivable(before)} tâche(s) validée(s) depuis plus de {older_than_days} jour(s)")
+    else:
+        start = time.perf_counter()
+        archived, batches = archive_tasks(older_than_days, batch_size, max_batches, pause)
+        click.echo(f"{archived} tâche(s) archivée(s) en {batches} lot(s) ({time.perf_counter() - start:.1f} s)")
+
+    conflicts, ids = id_conflicts()
+    if conflicts:
+        # Id réattribué par la base à une nouvelle tâche : elle reste dans tasks, à traiter à la main
+        click.echo(f"{conflicts} tâche(s) non archivable(s) : id déjà présent dans tasks_archive "
+                   f"({', '.join(map(str, ids))}{', ...' if conflicts > len(ids) else ''})", err=True)
+        raise SystemExit(1)
+
+
+@click.command("compact-tombstones")
+def compact_tombstones_command():
+    """Supprime les tombstones plus vieux que SYNC_TOMBSTONE_RETENTION (à planifier, par ex. en cron)."""
+    click.echo(f"{compact_tombstones()} tombstone(s) supprimé(s)")
+
+
+def init_app(app):
+    app.cli.add_command(seed_command)
+    app.cli.add_command(archive_tasks_command)
+    app.cli.add_command(compact_tombstones_command)
@@ -12,3 +12,106 @@ class Config:
         SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI.replace("postgres://", "postgresql://", 1)
         
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Réplica en lecture seule pour les requêtes GET (optionnel), et durée (secondes)
+    # pendant laquelle un client reste sur le primaire après une écriture
+    DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+    REPLICA_STICKY_SECONDS = float(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+
+    # Pool de connexions (vide = valeur par défaut du dialecte, voir services/db_pool.py)
+    DB_POOL_SIZE = int(os.environ["DB_POOL_SIZE"]) if os.environ.get("DB_POOL_SIZE") else None
+    DB_MAX_OVERFLOW = int(os.environ["DB_MAX_OVERFLOW"]) if os.environ.get("DB_MAX_OVERFLOW") else None
+    DB_POOL_TIMEOUT = float(os.environ["DB_POOL_TIMEOUT"]) if os.environ.get("DB_POOL_TIMEOUT") else None
+    DB_POOL_RECYCLE = int(os.environ["DB_POOL_RECYCLE"]) if os.environ.get("DB_POOL_RECYCLE") else None
+    DB_POOL_PRE_PING = (os.environ["DB_POOL_PRE_PING"].lower() in ("1", "true", "yes")
+                        if os.environ.get("DB_POOL_PRE_PING") else None)
+
+    # Durée (secondes) du cache par worker des rôles et profils utilisateurs
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 300))
+
+    # Tokens révoqués : "database" (partagé entre workers) ou "memory" (un seul processus)
+    TOKEN_BLOCKLIST_BACKEND = os.environ.get("TOKEN_BLOCKLIST_BACKEND", "database")
+    # Durée (secondes) pendant laquelle un worker considère un token non révoqué sans relire la base
+    TOKEN_BLOCKLIST_NEGATIVE_TTL = int(os.environ.get("TOKEN_BLOCKLIST_NEGATIVE_TTL", 5))
+    # Intervalle minimal (secondes) entre deux purges des révocations expirées
+    TOKEN_BLOCKLIST_PURGE_INTERVAL = int(os.environ.get("TOKEN_BLOCKLIST_PURGE_INTERVAL", 600))
+
+    # Coût bcrypt (2^n itérations) ; les anciens hash sont mis à niveau à la connexion
+    BCRYPT_LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))
+    # Pool de threads dédié à bcrypt (0 = hachage dans le thread de la requête)
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 4))
+    # Hachages en cours + en attente au-delà desquels on répond 503
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 32))
+    # Attente maximale (secondes) d'un hachage avant de répondre 503
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
+
+    # En-tête X-Total-Count des listes de tâches (?count=1) ; false pour ne jamais l'envoyer
+    TASK_LIST_TOTAL_COUNT = os.environ.get("TASK_LIST_TOTAL_COUNT", "true").lower() in ("1", "true", "yes")
+
+    # Pas d'ETag sur une liste modifiée il y a moins de N secondes (dates à la seconde sous MySQL)
+    ETAG_RACY_WINDOW = float(os.environ.get("ETAG_RACY_WINDOW", 1))
+
+    # Flux /api/events : "database" (partagé entre workers) ou "memory" (un seul processus)
+    EVENTS_BACKEND = os.environ.get("EVENTS_BACKEND", "database")
+    # Intervalle (secondes) de lecture de task_events par chaque flux ouvert
+    EVENTS_POLL_INTERVAL = float(os.environ.get("EVENTS_POLL_INTERVAL", 2))
+    # Durée max d'une connexion SSE avant reconnexion automatique du navigateur
+    EVENTS_STREAM_MAX_SECONDS = int(os.environ.get("EVENTS_STREAM_MAX_SECONDS", 300))
+    # Fenêtre (secondes) pendant laquelle un flux relit les événements déjà dépassés :
+    # un id attribué par une transaction plus lente peut devenir visible après un id supérieur
+    EVENTS_REORDER_WINDOW = int(os.environ.get("EVENTS_REORDER_WINDOW", 10))
+    # Flux SSE ouverts en même temps par worker (chacun occupe un thread gunicorn) ;
+    # par défaut la moitié des threads, l'autre moitié reste aux autres routes
+    EVENTS_MAX_STREAMS = int(os.environ.get("EVENTS_MAX_STREAMS",
+                                            max(1, int(os.environ.get("GUNICORN_THREADS", 8)) // 2)))
+    # Conservation (secondes) des événements dans task_events
+    EVENTS_RETENTION = int(os.environ.get("EVENTS_RETENTION", 3600))
+    # Intervalle minimal (secondes) entre deux purges de task_events
+    EVENTS_PURGE_INTERVAL = int(os.environ.get("EVENTS_PURGE_INTERVAL", 300))
+
+    # Synchronisation incrémentale (?since=) : conservation des tombstones (secondes),
+    # marge de recouvrement du jeton et intervalle entre deux compactages
+    SYNC_TOMBSTONE_RETENTION = int(os.environ.get("SYNC_TOMBSTONE_RETENTION", 30 * 86400))
+    SYNC_SAFETY_MARGIN = float(os.environ.get("SYNC_SAFETY_MARGIN", 2))
+    SYNC_COMPACTION_INTERVAL = int(os.environ.get("SYNC_COMPACTION_INTERVAL", 3600))
+
+    # Recherche MySQL : innodb_ft_min_token_size du serveur (mots plus courts non indexés)
+    SEARCH_MYSQL_MIN_TOKEN_SIZE = int(os.environ.get("SEARCH_MYSQL_MIN_TOKEN_SIZE", 3))
+
+    # Encodeur JSON des réponses : "auto" (orjson si installé), "orjson" ou "stdlib"
+    JSON_BACKEND = os.environ.get("JSON_BACKEND", "auto")
+    # Compression des réponses : encodages proposés (vide = désactivée), taille minimale (octets), niveaux
+    COMPRESS_ALGORITHMS = os.environ.get("COMPRESS_ALGORITHMS", "br,gzip")
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get("COMPRESS_BROTLI_QUALITY", 4))
+
+    # Métriques Prometheus sur /metrics, lues avec "Authorization: Bearer <METRICS_TOKEN>" ;
+    # sans METRICS_TOKEN l'endpoint répond 403 à tout le monde
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+    # Archivage (flask archive-tasks) : âge minimal (jours depuis la validation) et taille des lots
+    ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", 90))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", 1000))
+
+    # Préchauffage du worker (services/warmup.py) : au démarrage sous gunicorn (sinon au
+    # premier appel de /healthz) et nombre de connexions ouvertes d'avance dans le pool
+    WARMUP_ON_START = os.environ.get("WARMUP_ON_START", "true").lower() in ("1", "true", "yes")
+    WARMUP_POOL_CONNECTIONS = int(os.environ.get("WARMUP_POOL_CONNECTIONS", 2))
+
+    # Journaux : niveau, format ("json" ou "text"), ligne par requête HTTP, fraction des requêtes
+    # dont les messages DEBUG sont gardés et taille de la file d'écriture (voir services/structured_logging.py)
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+    LOG_REQUESTS = os.environ.get("LOG_REQUESTS", "true").lower() in ("1", "true", "yes")
+    LOG_DEBUG_SAMPLE_RATE = float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", 0.1))
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
+    # Budget de requêtes SQL par route : "off", "log" ou "raise" (voir services/query_budget.py) ;
+    # QUERY_BUDGET_HEADER autorise l'en-tête X-Query-Budget à choisir le mode par requête
+    QUERY_BUDGET_MODE = os.environ.get("QUERY_BUDGET_MODE", "off")
+    QUERY_BUDGET_HEADER = os.environ.get("QUERY_BUDGET_HEADER", "false").lower() in ("1", "true", "yes")
+
+    # Statistiques admin lues dans task_counters (à remplir avec scripts/rebuild_task_counters.py)
+    TASK_COUNTERS_ENABLED = os.environ.get("TASK_COUNTERS_ENABLED", "false").lower() in ("1", "true", "yes")
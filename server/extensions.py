@@ -1,11 +1,16 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from utils.routing_session import RoutingSession
 
-db = SQLAlchemy()
-migrate = Migrate()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 bcrypt = Bcrypt()
 jwt = JWTManager()
 cors = CORS()
+
+
+def init_migrate(app):
+    """Flask-Migrate importe Alembic (~0,2 s) : à n'enregistrer que pour les commandes `flask`"""
+    from flask_migrate import Migrate
+    Migrate(app, db)
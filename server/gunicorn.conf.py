@@ -0,0 +1,35 @@
+# Configuration gunicorn, lue automatiquement par `gunicorn app:app` (Procfile, render.yaml)
+import os
+import shutil
+import tempfile
+
+# Workers à threads : pendant qu'un thread attend bcrypt ou la base,
+# les autres continuent de servir les requêtes du même worker. Un flux SSE
+# (/api/events) garde son thread jusqu'à EVENTS_STREAM_MAX_SECONDS : au plus
+# EVENTS_MAX_STREAMS flux par worker (moitié des threads par défaut).
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+
+# Métriques Prometheus agrégées entre workers : chaque worker écrit dans ce
+# dossier (à définir avant l'import de l'application dans les workers)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "notejour-metrics"))
+
+
+def on_starting(server):
+    # Valeurs d'un lancement précédent : à effacer avant le démarrage des workers
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    # Avant la première requête du worker : mappers, pool et requêtes fréquentes (services/warmup.py)
+    from services.warmup import warm_up_on_start
+    warm_up_on_start(worker.wsgi)
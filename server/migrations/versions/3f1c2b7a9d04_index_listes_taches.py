@@ -0,0 +1,37 @@
+"""index pour les listes de taches
+
+Revision ID: 3f1c2b7a9d04
+Revises: e6083252ac23
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2b7a9d04'
+down_revision = 'e6083252ac23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Mes tâches / tâches d'un utilisateur : filtre user_id, tri created_at DESC, id DESC
+    op.create_index('ix_tasks_user_id_created_at', 'tasks',
+                    ['user_id', sa.text('created_at DESC'), sa.text('id DESC')])
+    # Liste admin : tri (et pagination par curseur) sur created_at, id
+    op.create_index('ix_tasks_created_at_id', 'tasks', ['created_at', 'id'])
+    # Files par statut (ex : tâches 'terminé' à valider)
+    op.create_index('ix_tasks_statut_created_at', 'tasks', ['statut', 'created_at'])
+    op.create_index('ix_tasks_assigned_by_id', 'tasks', ['assigned_by_id'])
+    # Liste des utilisateurs d'un rôle
+    op.create_index('ix_users_role_id', 'users', ['role_id'])
+
+
+def downgrade():
+    op.drop_index('ix_users_role_id', table_name='users')
+    op.drop_index('ix_tasks_assigned_by_id', table_name='tasks')
+    op.drop_index('ix_tasks_statut_created_at', table_name='tasks')
+    op.drop_index('ix_tasks_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_user_id_created_at', table_name='tasks')
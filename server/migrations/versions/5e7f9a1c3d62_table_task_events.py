@@ -0,0 +1,38 @@
+"""table task_events
+
+Revision ID: 5e7f9a1c3d62
+Revises: c41a9e3d5b20
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e7f9a1c3d62'
+down_revision = 'c41a9e3d5b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Journal des changements de tâches lu par le flux SSE /api/events
+    op.create_table(
+        'task_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=30), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('payload', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_events_user_id', 'task_events', ['user_id'])
+    op.create_index('ix_task_events_created_at', 'task_events', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_task_events_created_at', table_name='task_events')
+    op.drop_index('ix_task_events_user_id', table_name='task_events')
+    op.drop_table('task_events')
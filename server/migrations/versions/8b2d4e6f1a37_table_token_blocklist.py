@@ -0,0 +1,33 @@
+"""table token_blocklist
+
+Revision ID: 8b2d4e6f1a37
+Revises: 3f1c2b7a9d04
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2d4e6f1a37'
+down_revision = '3f1c2b7a9d04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tokens révoqués partagés entre les workers, purgés après leur expiration
+    op.create_table(
+        'token_blocklist',
+        sa.Column('jti', sa.String(length=64), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index('ix_token_blocklist_expires_at', 'token_blocklist', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_token_blocklist_expires_at', table_name='token_blocklist')
+    op.drop_table('token_blocklist')
@@ -0,0 +1,39 @@
+"""synchronisation incrementale : tombstones et index updated_at
+
+Revision ID: 9a3c5e7b1d84
+Revises: 5e7f9a1c3d62
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3c5e7b1d84'
+down_revision = '5e7f9a1c3d62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tâches supprimées, renvoyées aux clients qui synchronisent avec ?since=
+    op.create_table(
+        'task_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_tombstones_user_id', 'task_tombstones', ['user_id'])
+    op.create_index('ix_task_tombstones_deleted_at', 'task_tombstones', ['deleted_at'])
+    # Mes tâches modifiées depuis X (ix_tasks_updated_at_id couvre déjà la vue admin)
+    op.create_index('ix_tasks_user_id_updated_at', 'tasks', ['user_id', 'updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_tasks_user_id_updated_at', table_name='tasks')
+    op.drop_index('ix_task_tombstones_deleted_at', table_name='task_tombstones')
+    op.drop_index('ix_task_tombstones_user_id', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
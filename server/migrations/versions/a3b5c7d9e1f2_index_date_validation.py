@@ -0,0 +1,24 @@
+"""index sur la date de validation des taches
+
+Revision ID: a3b5c7d9e1f2
+Revises: f2a4c6e8b0d1
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3b5c7d9e1f2'
+down_revision = 'f2a4c6e8b0d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filtres ?validated_after= / ?validated_before= des listes de tâches
+    op.create_index('ix_tasks_date_validation', 'tasks', ['date_validation'])
+
+
+def downgrade():
+    op.drop_index('ix_tasks_date_validation', table_name='tasks')
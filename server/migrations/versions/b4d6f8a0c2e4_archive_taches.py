@@ -0,0 +1,50 @@
+"""archive des taches validees
+
+Revision ID: b4d6f8a0c2e4
+Revises: a3b5c7d9e1f2
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d6f8a0c2e4'
+down_revision = 'a3b5c7d9e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tâches validées anciennes, déplacées par `flask archive-tasks` (même id que dans tasks)
+    op.create_table(
+        'tasks_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('titre', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('statut', sa.String(length=50), nullable=False),
+        sa.Column('note_utilisateur', sa.Text(), nullable=True),
+        sa.Column('valide_par_admin', sa.Boolean(), nullable=True),
+        sa.Column('date_validation', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('assigned_by_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['assigned_by_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tasks_archive_user_id_date_validation', 'tasks_archive',
+                    ['user_id', sa.text('date_validation DESC'), sa.text('id DESC')])
+    op.create_index('ix_tasks_archive_date_validation_id', 'tasks_archive', ['date_validation', 'id'])
+    # Sélection des lots : statut = 'validé' AND date_validation < ? ORDER BY date_validation, id
+    op.create_index('ix_tasks_statut_date_validation', 'tasks', ['statut', 'date_validation', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_tasks_statut_date_validation', table_name='tasks')
+    op.drop_index('ix_tasks_archive_date_validation_id', table_name='tasks_archive')
+    op.drop_index('ix_tasks_archive_user_id_date_validation', table_name='tasks_archive')
+    op.drop_table('tasks_archive')
@@ -0,0 +1,25 @@
+"""index tasks.updated_at
+
+Revision ID: c41a9e3d5b20
+Revises: 8b2d4e6f1a37
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41a9e3d5b20'
+down_revision = '8b2d4e6f1a37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Version des listes (ETag) : max(updated_at) lu dans l'index
+    op.create_index('ix_tasks_updated_at_id', 'tasks', ['updated_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_tasks_updated_at_id', table_name='tasks')
@@ -0,0 +1,25 @@
+"""index users.updated_at
+
+Revision ID: c8e0a2b4d6f1
+Revises: b4d6f8a0c2e4
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e0a2b4d6f1'
+down_revision = 'b4d6f8a0c2e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Version des listes qui incluent l'utilisateur assigné (ETag) : max(users.updated_at) lu dans l'index
+    op.create_index('ix_users_updated_at', 'users', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_users_updated_at', table_name='users')
@@ -0,0 +1,35 @@
+"""compteurs de taches pour les statistiques admin
+
+Revision ID: d7e1f3a5b9c2
+Revises: 9a3c5e7b1d84
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7e1f3a5b9c2'
+down_revision = '9a3c5e7b1d84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Compteurs par (utilisateur, statut) ; à remplir avec scripts/rebuild_task_counters.py
+    op.create_table(
+        'task_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('statut', sa.String(length=50), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'statut')
+    )
+    # GROUP BY user_id, statut des statistiques calculées en direct : lecture de l'index seul
+    op.create_index('ix_tasks_user_id_statut', 'tasks', ['user_id', 'statut'])
+
+
+def downgrade():
+    op.drop_index('ix_tasks_user_id_statut', table_name='tasks')
+    op.drop_table('task_counters')
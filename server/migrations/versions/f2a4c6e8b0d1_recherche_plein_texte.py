@@ -0,0 +1,75 @@
+"""recherche plein texte sur les taches
+
+Revision ID: f2a4c6e8b0d1
+Revises: d7e1f3a5b9c2
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a4c6e8b0d1'
+down_revision = 'd7e1f3a5b9c2'
+branch_labels = None
+depends_on = None
+
+
+# Mêmes objets que les DDL de services/task_search.py (db.create_all())
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5(titre, description, note_utilisateur, "
+    "content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, titre, description, note_utilisateur) "
+    "VALUES (new.id, new.titre, new.description, new.note_utilisateur); END",
+    "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, titre, description, note_utilisateur) "
+    "VALUES ('delete', old.id, old.titre, old.description, old.note_utilisateur); END",
+    "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF titre, description, note_utilisateur ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, titre, description, note_utilisateur) "
+    "VALUES ('delete', old.id, old.titre, old.description, old.note_utilisateur); "
+    "INSERT INTO tasks_fts(rowid, titre, description, note_utilisateur) "
+    "VALUES (new.id, new.titre, new.description, new.note_utilisateur); END",
+    # Indexe les tâches existantes
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+)
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER tasks_fts_au",
+    "DROP TRIGGER tasks_fts_ad",
+    "DROP TRIGGER tasks_fts_ai",
+    "DROP TABLE tasks_fts",
+)
+
+# La colonne générée est calculée pour les lignes existantes par l'ALTER TABLE
+POSTGRESQL_UPGRADE = (
+    "ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('french', coalesce(titre, '')), 'A') || "
+    "setweight(to_tsvector('french', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('french', coalesce(note_utilisateur, '')), 'C')) STORED",
+    "CREATE INDEX ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+)
+POSTGRESQL_DOWNGRADE = (
+    "DROP INDEX ix_tasks_search_vector",
+    "ALTER TABLE tasks DROP COLUMN search_vector",
+)
+
+MYSQL_UPGRADE = (
+    "CREATE FULLTEXT INDEX ix_tasks_fulltext ON tasks (titre, description, note_utilisateur)",
+)
+MYSQL_DOWNGRADE = (
+    "DROP INDEX ix_tasks_fulltext ON tasks",
+)
+
+UPGRADE = {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRESQL_UPGRADE, "mysql": MYSQL_UPGRADE}
+DOWNGRADE = {"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRESQL_DOWNGRADE, "mysql": MYSQL_DOWNGRADE}
+
+
+def upgrade():
+    # Autres dialectes : recherche par LIKE, rien à créer
+    for statement in UPGRADE.get(op.get_bind().dialect.name, ()):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in DOWNGRADE.get(op.get_bind().dialect.name, ()):
+        op.execute(statement)
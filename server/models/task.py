@@ -1,6 +1,14 @@
 from extensions import db
 from datetime import datetime
 
+STATUTS = ('à faire', 'en cours', 'terminé', 'validé')
+
+# Transitions qu'un utilisateur peut faire sur ses tâches : statut demandé -> statuts de départ
+TRANSITIONS_UTILISATEUR = {
+    'en cours': ('à faire',),
+    'terminé': ('à faire', 'en cours'),
+}
+
 class Task(db.Model):
     __tablename__ = 'tasks'
     
@@ -28,9 +36,9 @@ class Task(db.Model):
             'statut': self.statut,
             'note_utilisateur': self.note_utilisateur,
             'valide_par_admin': self.valide_par_admin,
-            'date_validation': self.date_validation.isoformat() if self.date_validation else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'date_validation': self.date_validation,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'user_id': self.user_id,
             'assigned_by_id': self.assigned_by_id,
             'user': {
@@ -39,4 +47,17 @@ class Task(db.Model):
                 'prenom': self.user.prenom,
                 'email': self.user.email
             } if self.user else None
-        }
\ No newline at end of file
+        }
+
+
+# Index alignés sur les requêtes des listes (voir migrations/versions/3f1c2b7a9d04)
+db.Index('ix_tasks_user_id_created_at', Task.user_id, Task.created_at.desc(), Task.id.desc())
+db.Index('ix_tasks_created_at_id', Task.created_at, Task.id)
+db.Index('ix_tasks_statut_created_at', Task.statut, Task.created_at)
+db.Index('ix_tasks_assigned_by_id', Task.assigned_by_id)
+db.Index('ix_tasks_updated_at_id', Task.updated_at, Task.id)
+db.Index('ix_tasks_user_id_updated_at', Task.user_id, Task.updated_at)
+db.Index('ix_tasks_user_id_statut', Task.user_id, Task.statut)
+db.Index('ix_tasks_date_validation', Task.date_validation)
+# Lots de l'archivage : tâches validées les plus anciennes d'abord (services/task_archive.py)
+db.Index('ix_tasks_statut_date_validation', Task.statut, Task.date_validation, Task.id)
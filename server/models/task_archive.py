@@ -0,0 +1,26 @@
+from extensions import db
+from datetime import datetime
+
+class TaskArchive(db.Model):
+    """Tâche validée sortie de tasks par l'archivage (services/task_archive.py), avec le même id"""
+    __tablename__ = 'tasks_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    titre = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    statut = db.Column(db.String(50), nullable=False)
+    note_utilisateur = db.Column(db.Text, nullable=True)
+    valide_par_admin = db.Column(db.Boolean, nullable=True)
+    date_validation = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    assigned_by_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+
+
+# Listes de l'archive : plus récemment validées d'abord (keyset date_validation, id)
+db.Index('ix_tasks_archive_user_id_date_validation', TaskArchive.user_id,
+         TaskArchive.date_validation.desc(), TaskArchive.id.desc())
+db.Index('ix_tasks_archive_date_validation_id', TaskArchive.date_validation, TaskArchive.id)
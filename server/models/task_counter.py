@@ -0,0 +1,9 @@
+from extensions import db
+
+class TaskCounter(db.Model):
+    """Nombre de tâches par (utilisateur, statut), tenu à jour à chaque écriture (TASK_COUNTERS_ENABLED)"""
+    __tablename__ = 'task_counters'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    statut = db.Column(db.String(50), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
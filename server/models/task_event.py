@@ -0,0 +1,13 @@
+from extensions import db
+from datetime import datetime
+
+class TaskEvent(db.Model):
+    """Journal des changements de tâches diffusé par /api/events"""
+    __tablename__ = 'task_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(30), nullable=False)  # 'task.created', 'task.updated', ...
+    task_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True, index=True)  # propriétaire de la tâche
+    payload = db.Column(db.Text, nullable=True)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
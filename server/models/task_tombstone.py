@@ -0,0 +1,11 @@
+from extensions import db
+from datetime import datetime
+
+class TaskTombstone(db.Model):
+    """Trace d'une tâche supprimée, pour la synchronisation incrémentale (?since=)"""
+    __tablename__ = 'task_tombstones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True, index=True)  # propriétaire de la tâche supprimée
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,11 @@
+from extensions import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    """Token révoqué (déconnexion), partagé entre tous les workers"""
+    __tablename__ = 'token_blocklist'
+
+    jti = db.Column(db.String(64), primary_key=True)
+    # Date d'expiration du token : au-delà, la ligne peut être purgée
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1,7 +1,14 @@
-from extensions import db, bcrypt
+from extensions import db
+from services.passwords import password_hasher
 from flask_jwt_extended import get_jwt_identity
 from sqlalchemy.ext.hybrid import hybrid_property
 
+
+def default_photo_url(prenom, nom):
+    """Photo de profil par défaut (initiales) si aucune n'est définie"""
+    return f'https://ui-avatars.com/api/?name={prenom}+{nom}&background=4F46E5&color=fff&size=200'
+
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -13,33 +20,36 @@ class User(db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
     photo_profile = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
-    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+    # Indexé : max(updated_at) fait partie de l'ETag des listes de tâches (utils/http_cache.py)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp(),
+                           index=True)
     
-    role_id = db.Column(db.Integer, db.ForeignKey('roles.id'), nullable=False)
+    role_id = db.Column(db.Integer, db.ForeignKey('roles.id'), nullable=False, index=True)
     role = db.relationship('Role', backref='users')
     
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
     
     @hybrid_property
     def is_admin(self):
         return self.role.nom == 'admin'
     
     def to_dict(self):
-        # Génère une photo de profil par défaut si aucune n'est définie
-        default_photo = f'https://ui-avatars.com/api/?name={self.prenom}+{self.nom}&background=4F46E5&color=fff&size=200'
         return {
             'id': self.id,
             'nom': self.nom,
             'prenom': self.prenom,
             'email': self.email,
             'telephone': self.telephone,
-            'photo_profile': self.photo_profile or default_photo,
+            'photo_profile': self.photo_profile or default_photo_url(self.prenom, self.nom),
             'role': self.role.nom if self.role else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
     
     def to_dict_with_tasks(self):
@@ -1,17 +1,24 @@
+import logging
+
 from flask import Blueprint, request, jsonify
 from extensions import db
 from models.user import User
 from models.role import Role
-from werkzeug.security import generate_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity, decode_token
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt
+from services.identity import cache_user, current_identity, current_profile, identity_claims
+from services.query_budget import query_budget
+from services.token_blocklist import revoke_token
+from services.user_queries import USER_FIELDS, fetch_user_dicts, user_list_select
+from utils.fieldsets import InvalidFields, parse_fields
+from utils.http_cache import json_with_etag
 from datetime import datetime, timedelta
 import json
 
 auth_bp = Blueprint("auth", __name__)
-
-token_blacklist = {}
+logger = logging.getLogger(__name__)
 
 @auth_bp.post("/login")
+@query_budget(2)
 def login():
     data = request.get_json()
     email = data.get("email")
@@ -25,15 +32,27 @@ def login():
     user = User.query.filter_by(email=email).first()
 
     if not user or not user.check_password(password):
+        # Pas d'email dans les journaux : seulement de quoi repérer une rafale d'échecs
+        logger.info("Connexion refusée", extra={"user_id": user.id if user else None})
         return {"error": "Email ou mot de passe incorrect"}, 401
 
+    # Coût bcrypt modifié depuis le dernier hachage : on profite du mot de passe en clair
+    if user.password_needs_rehash():
+        user.set_password(password)
+        db.session.commit()
+        logger.info("Hash du mot de passe mis à niveau", extra={"user_id": user.id})
+
     expires_delta = timedelta(days=30)
     token_data = {"email": str(user.email), "user_id": user.id}
 
+    # Le rôle voyage dans le token : les routes protégées n'interrogent plus la base
     access_token = create_access_token(
         identity=json.dumps(token_data),
+        additional_claims=identity_claims(user),
         expires_delta=expires_delta
     )
+    cache_user(user)
+    logger.info("Connexion réussie", extra={"user_id": user.id})
 
     return {
         "message": "Connexion réussie",
@@ -50,28 +69,16 @@ def login():
     }, 200
 
 @auth_bp.post("/logout")
+@query_budget(3)
 @jwt_required()
 def logout():
-    jti = get_jwt()["jti"]
-    token_blacklist[jti] = datetime.utcnow().isoformat()
-    return {"message": "Déconnexion réussie", "logout_time": datetime.utcnow().isoformat()}, 200
-
-def is_token_blacklisted(jti):
-    return jti in token_blacklist
-
-def cleanup_old_tokens(max_age_days=7):
-    cutoff_time = datetime.utcnow() - timedelta(days=max_age_days)
-    to_remove = []
-    for jti, t in token_blacklist.items():
-        try:
-            if datetime.fromisoformat(t) < cutoff_time:
-                to_remove.append(jti)
-        except:
-            to_remove.append(jti)
-    for jti in to_remove:
-        token_blacklist.pop(jti, None)
+    claims = get_jwt()
+    revoke_token(claims)
+    logger.info("Déconnexion", extra={"user_id": claims.get("user_id")})
+    return {"message": "Déconnexion réussie", "logout_time": datetime.utcnow()}, 200
 
 @auth_bp.post("/register")
+@query_budget(4)
 def register():
     data = request.get_json()
     nom = data.get("nom")
@@ -104,50 +111,45 @@ def register():
     user = User(nom=nom, prenom=prenom, email=email, telephone=telephone, role_id=role_obj.id)
     user.set_password(password)
     db.session.add(user)
+    db.session.flush()
+    # Lus avant le commit, qui expire les objets (sinon deux SELECT de plus)
+    user_id, role = user.id, role_obj.nom
     db.session.commit()
+    logger.info("Compte créé", extra={"user_id": user_id, "role": role})
 
     return {"message": "Utilisateur créé avec succès"}, 201
 
 @auth_bp.get("/me")
+@query_budget(2)
 @jwt_required()
 def get_current_user():
-    identity = get_jwt_identity()
-    try:
-        email = json.loads(identity).get("email")
-    except:
-        email = identity
-    user = User.query.filter_by(email=email).first()
-    if not user:
+    profile = current_profile()
+    if not profile:
         return {"error": "Utilisateur non trouvé"}, 404
-    return jsonify(user.to_dict()), 200
+    return json_with_etag(profile)
 
 @auth_bp.get("/users")
+@query_budget(3)
 @jwt_required()
 def get_users():
-    identity = get_jwt_identity()
-    try:
-        email = json.loads(identity).get("email")
-    except:
-        email = identity
-    current_user = User.query.filter_by(email=email).first()
-    if not current_user or current_user.role.nom != "admin":
+    current_user = current_identity()
+    if not current_user or not current_user.is_admin:
         return {"error": "Accès non autorisé"}, 403
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users]), 200
+    try:
+        fields = parse_fields(request.args, USER_FIELDS)
+    except InvalidFields as e:
+        return {"error": "Champs invalides", "message": str(e)}, 400
+    users = fetch_user_dicts(user_list_select(fields=fields), fields)
+    return jsonify(users), 200
 
 
 @auth_bp.post("/admin/create-user")
+@query_budget(8)
 @jwt_required()
 def admin_create_user():
-    identity = get_jwt_identity()
-    try:
-        email = json.loads(identity).get("email")
-    except:
-        email = identity
-    
-    current_user = User.query.filter_by(email=email).first()
+    current_user = current_identity()
     
-    if not current_user or current_user.role.nom.lower() != "admin":
+    if not current_user or not current_user.is_admin:
         return {"error": "Accès non autorisé"}, 403
 
     data = request.get_json()
@@ -189,6 +191,9 @@ def admin_create_user():
     new_user.set_password(password)
     db.session.add(new_user)
     db.session.commit()
+    logger.info("Compte créé par un administrateur", extra={
+        "user_id": new_user.id, "role": role_obj.nom, "admin_id": current_user.id
+    })
 
     return {
         "message": "Utilisateur créé avec succès",
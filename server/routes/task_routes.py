@@ -1,25 +1,42 @@
-from flask import Blueprint, request, jsonify
+import logging
+
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
-from models.user import User
-from models.task import Task
+from models.task import STATUTS, TRANSITIONS_UTILISATEUR, Task
+from models.role import Role
+from models.task_archive import TaskArchive
+from services.task_bulk import (
+    BulkRequestError, create_tasks, delete_tasks, delete_tasks_matching, parse_bulk_create,
+    parse_delete_filter, parse_task_ids, update_user_tasks_status, validate_tasks
+)
+from services.events import (
+    TASK_CREATED, TASK_DELETED, TASK_UPDATED, TASK_VALIDATED, event_stream, publish_task, reserve_stream
+)
+from services.db_pool import pool_stats
+from services.replica import replica_stats
+from services.identity import current_identity, current_profile, get_user_entry
+from services.query_budget import query_budget
+from services.task_archive import ARCHIVE_SORT, list_archived_tasks
+from services.sync import InvalidSyncToken, SyncTokenExpired, changes_since, decode_sync_token, record_tombstones
+from services.task_search import InvalidSearch, parse_search_args, search_tasks
+from services.task_stats import counters_enabled, dashboard_stats
+from services.task_queries import TASK_FIELDS, compact_tasks, fetch_task_dicts, task_list_select, task_row_to_dict
+from services.user_queries import USER_FIELDS, fetch_user_dicts, user_list_select
+from utils.http_cache import is_not_modified, json_with_etag, not_modified_response, task_list_state, with_etag
+from utils.fieldsets import InvalidFields, parse_compact, parse_fields
+from utils.pagination import DEFAULT_LIMIT, InvalidPagination, parse_pagination_args, parse_sort, paginate_tasks, sort_order
+from utils.task_filters import InvalidFilters, has_filters, parse_task_filters
 from datetime import datetime
-import json
 from flask_jwt_extended import get_jwt
 
 task_bp = Blueprint("tasks", __name__)
+logger = logging.getLogger(__name__)
 
 
 def get_current_user():
-    """Récupère l'utilisateur actuel à partir du token (email)"""
-    user_identity = get_jwt_identity()
-    try:
-        data = json.loads(user_identity)
-        email = data.get("email")
-    except:
-        email = user_identity
-    return User.query.filter_by(email=email).first()
-
+    """Récupère l'utilisateur actuel (cache des utilisateurs, sinon relu en base)"""
+    return current_identity()
 
 
 def check_admin_access():
@@ -28,21 +45,134 @@ def check_admin_access():
     if not current_user:
         return False, None
     
-    if not current_user.role:
-        return False, current_user
-    
-    is_admin = current_user.role.nom.lower() == 'admin'
-    return is_admin, current_user
+    return current_user.is_admin, current_user
+
+
+def tasks_response(user_id=None):
+    """Sérialise les tâches (de user_id, ou toutes), paginées si limit/cursor sont fournis.
+
+    Sans paramètre de pagination, la réponse reste la liste complète
+    (format historique attendu par le frontend). Avec limit et/ou cursor,
+    la réponse devient {"tasks": [...], "next_cursor": ..., "limit": ...}.
+    ?fields= limite les champs (et les colonnes lues) ; ?compact=1 renvoie
+    {"tasks": [...], "users": {id: user}} sans répéter l'utilisateur sur
+    chaque tâche. Si le client possède déjà la version courante
+    (If-None-Match), la réponse est un 304 sans corps. Avec ?since=<jeton>,
+    seules les modifications depuis le jeton sont renvoyées (voir services/sync.py).
+    Les filtres (utils/task_filters.py) et ?sort= sont appliqués dans la
+    requête SQL ; ?count=1 ajoute l'en-tête X-Total-Count.
+    """
+    try:
+        fields = parse_fields(request.args, TASK_FIELDS)
+    except InvalidFields as e:
+        return jsonify({"error": "Champs invalides", "message": str(e)}), 400
+    compact = parse_compact(request.args)
+
+    if "since" in request.args:
+        if has_filters(request.args) or "sort" in request.args:
+            return jsonify({
+                "error": "Filtres invalides",
+                "message": "Les filtres et le tri ne s'appliquent pas à ?since="
+            }), 400
+        return sync_response(user_id, fields, compact)
+
+    criteria = [] if user_id is None else [Task.user_id == user_id]
+    try:
+        criteria += parse_task_filters(request.args, allow_user_id=user_id is None)
+    except InvalidFilters as e:
+        return jsonify({"error": "Filtres invalides", "message": str(e)}), 400
+    try:
+        sort = parse_sort(request.args)
+        page = parse_pagination_args(request.args, sort)
+    except InvalidPagination as e:
+        return jsonify({"error": "Pagination invalide", "message": str(e)}), 400
+
+    # Le nombre de tâches vient de la requête d'agrégat de l'ETag : pas de COUNT en plus
+    etag, total = task_list_state(*criteria, with_users=fields is None or "user" in fields)
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
+    stmt = task_list_select(*criteria, fields=fields)
+    if page is None:
+        stmt = stmt.order_by(*sort_order(sort))
+        tasks = fetch_task_dicts(stmt, fields)
+        if not compact:
+            return with_total_count(with_etag(jsonify(tasks), etag), total), 200
+        return with_total_count(with_etag(jsonify({"tasks": tasks, "users": compact_tasks(tasks)}), etag), total), 200
+
+    limit, position = page
+    rows, next_cursor = paginate_tasks(stmt, limit, position, sort)
+    body = {
+        "tasks": [task_row_to_dict(row, fields) for row in rows],
+        "next_cursor": next_cursor,
+        "limit": limit
+    }
+    if compact:
+        body["users"] = compact_tasks(body["tasks"])
+    return with_total_count(with_etag(jsonify(body), etag), total), 200
+
 
+def with_total_count(response, total):
+    """Ajoute X-Total-Count si le client l'a demandé (?count=1) et que TASK_LIST_TOTAL_COUNT l'autorise"""
+    if request.args.get("count") in ("1", "true") and current_app.config.get("TASK_LIST_TOTAL_COUNT", True):
+        response.headers["X-Total-Count"] = str(total)
+    return response
 
-def check_user_role(user, expected_role='user'):
-    """Vérifie le rôle d'un utilisateur (insensible à la casse)"""
-    if not user or not user.role:
-        return False
-    return user.role.nom.lower() == expected_role
+
+def sync_response(user_id=None, fields=None, compact=False):
+    """Tâches modifiées et supprimées depuis ?since=, avec le jeton suivant"""
+    try:
+        changes = changes_since(decode_sync_token(request.args["since"]), user_id, fields)
+    except InvalidSyncToken as e:
+        return jsonify({"error": "Synchronisation invalide", "message": str(e)}), 400
+    except SyncTokenExpired:
+        return jsonify({
+            "error": "Jeton de synchronisation expiré",
+            "message": "Relancez une synchronisation complète avec ?since=0",
+            "full_resync": True
+        }), 410
+    if compact:
+        changes["users"] = compact_tasks(changes["tasks"])
+    return jsonify(changes), 200
+
+
+def search_response(user_id=None):
+    """Recherche plein texte (?q=) dans les tâches (de user_id, ou toutes), triée par pertinence"""
+    criteria = [] if user_id is None else [Task.user_id == user_id]
+    try:
+        fields = parse_fields(request.args, TASK_FIELDS)
+        terms, limit, offset = parse_search_args(request.args)
+        criteria += parse_task_filters(request.args, allow_user_id=user_id is None)
+    except InvalidFields as e:
+        return jsonify({"error": "Champs invalides", "message": str(e)}), 400
+    except InvalidSearch as e:
+        return jsonify({"error": "Recherche invalide", "message": str(e)}), 400
+    except InvalidFilters as e:
+        return jsonify({"error": "Filtres invalides", "message": str(e)}), 400
+
+    tasks, next_cursor = search_tasks(terms, limit, offset, criteria, fields=fields)
+    return jsonify({"tasks": tasks, "next_cursor": next_cursor, "limit": limit}), 200
+
+
+def archive_response(user_id=None):
+    """Tâches archivées (de user_id, ou toutes), toujours paginées, plus récemment validées d'abord"""
+    criteria = [] if user_id is None else [TaskArchive.user_id == user_id]
+    try:
+        criteria += parse_task_filters(request.args, allow_user_id=user_id is None, model=TaskArchive)
+    except InvalidFilters as e:
+        return jsonify({"error": "Filtres invalides", "message": str(e)}), 400
+    try:
+        page = parse_pagination_args(request.args, ARCHIVE_SORT)
+    except InvalidPagination as e:
+        return jsonify({"error": "Pagination invalide", "message": str(e)}), 400
+
+    limit, position = page or (DEFAULT_LIMIT, None)
+    tasks, next_cursor = list_archived_tasks(criteria, limit, position)
+    return jsonify({"tasks": tasks, "next_cursor": next_cursor, "limit": limit}), 200
 
 
 @task_bp.route("/admin/users", methods=["GET"])
+@query_budget(3)
 @jwt_required()
 def get_all_users():
     """Récupérer tous les utilisateurs (non-admin)"""
@@ -51,14 +181,20 @@ def get_all_users():
     if not is_admin:
         return jsonify({"error": "Accès non autorisé"}), 403
     
-    # Récupérer les utilisateurs avec rôle 'user'
-    users = User.query.filter(
-        db.func.lower(User.role.nom) == 'user'
-    ).all()
+    try:
+        fields = parse_fields(request.args, USER_FIELDS)
+    except InvalidFields as e:
+        return jsonify({"error": "Champs invalides", "message": str(e)}), 400
+    
+    # Récupérer les utilisateurs avec rôle 'user' (rôle lu par la jointure).
+    # Role() stocke toujours le nom en minuscules : l'égalité stricte peut
+    # utiliser l'index unique sur roles.nom puis ix_users_role_id.
+    users = fetch_user_dicts(user_list_select(Role.nom == 'user', fields=fields), fields)
     
-    return jsonify([user.to_dict() for user in users]), 200
+    return jsonify(users), 200
 
 @task_bp.route("/admin/tasks", methods=["GET"])
+@query_budget(4)
 @jwt_required()
 def get_all_tasks():
     """Récupérer toutes les tâches (pour l'admin)"""
@@ -67,10 +203,34 @@ def get_all_tasks():
     if not is_admin:
         return jsonify({"error": "Accès non autorisé"}), 403
     
-    tasks = Task.query.order_by(Task.created_at.desc()).all()
-    return jsonify([task.to_dict() for task in tasks]), 200
+    return tasks_response()
+
+@task_bp.route("/admin/tasks/search", methods=["GET"])
+@query_budget(3)
+@jwt_required()
+def search_all_tasks():
+    """Rechercher dans toutes les tâches (titre, description, note)"""
+    is_admin, current_user = check_admin_access()
+    
+    if not is_admin:
+        return jsonify({"error": "Accès non autorisé"}), 403
+    
+    return search_response()
+
+@task_bp.route("/admin/tasks/archive", methods=["GET"])
+@query_budget(3)
+@jwt_required()
+def get_archived_tasks():
+    """Tâches archivées de tous les utilisateurs (jamais incluses dans /admin/tasks)"""
+    is_admin, current_user = check_admin_access()
+    
+    if not is_admin:
+        return jsonify({"error": "Accès non autorisé"}), 403
+    
+    return archive_response()
 
 @task_bp.route("/admin/tasks", methods=["POST"])
+@query_budget(7)
 @jwt_required()
 def create_task():
     """Créer une nouvelle tâche et l'assigner à un utilisateur"""
@@ -88,9 +248,9 @@ def create_task():
     if not (user_id and titre):
         return jsonify({"error": "L'utilisateur et le titre sont obligatoires"}), 400
     
-    # user_id est un ID numérique
-    user = User.query.get(user_id)
-    if not user or not check_user_role(user, 'user'):
+    # user_id est un ID numérique (rôle lu depuis le cache des utilisateurs)
+    user = get_user_entry(user_id=user_id)
+    if not user or user["role"] != 'user':
         return jsonify({"error": "Utilisateur invalide. Doit être un utilisateur standard (non-admin)"}), 400
     
     task = Task(
@@ -102,11 +262,41 @@ def create_task():
     )
     
     db.session.add(task)
+    db.session.flush()
+    publish_task(TASK_CREATED, task.id, task.user_id, statut=task.statut)
     db.session.commit()
+    logger.info("Tâche créée", extra={"task_id": task.id, "user_id": task.user_id, "admin_id": current_user.id})
     
     return jsonify(task.to_dict()), 201
 
+@task_bp.route("/admin/tasks/bulk", methods=["POST"])
+@query_budget(6)
+@jwt_required()
+def create_tasks_bulk():
+    """Créer plusieurs tâches en une requête (liste de tâches ou une tâche pour plusieurs utilisateurs)"""
+    is_admin, current_user = check_admin_access()
+    
+    if not is_admin:
+        return jsonify({"error": "Accès non autorisé"}), 403
+    
+    try:
+        items = parse_bulk_create(request.get_json(silent=True))
+    except BulkRequestError as e:
+        return jsonify({"error": "Lot invalide", "message": str(e)}), 400
+    
+    created, results = create_tasks(items, current_user.id)
+    logger.info("Tâches créées en lot", extra={
+        "tasks_created": created, "errors": len(results) - created, "admin_id": current_user.id
+    })
+    
+    return jsonify({
+        "created": created,
+        "errors": len(results) - created,
+        "results": results
+    }), 201 if created else 400
+
 @task_bp.route("/admin/tasks/<int:task_id>", methods=["PUT"])
+@query_budget(7)
 @jwt_required()
 def update_task(task_id):
     """Modifier une tâche (admin uniquement)"""
@@ -127,14 +317,17 @@ def update_task(task_id):
         task.description = data['description']
     if 'statut' in data:
         # Vérifier que le statut est valide (admin peut tout faire)
-        if data['statut'] not in ['à faire', 'en cours', 'terminé', 'validé']:
+        if data['statut'] not in STATUTS:
             return jsonify({"error": "Statut invalide"}), 400
         task.statut = data['statut']
     
+    publish_task(TASK_UPDATED, task.id, task.user_id, statut=task.statut)
     db.session.commit()
+    logger.info("Tâche modifiée", extra={"task_id": task.id, "statut": task.statut, "admin_id": current_user.id})
     return jsonify(task.to_dict()), 200
 
 @task_bp.route("/admin/tasks/<int:task_id>/validate", methods=["PUT"])
+@query_budget(7)
 @jwt_required()
 def validate_task(task_id):
     """Admin valide une tâche que l'utilisateur a marqué comme terminée"""
@@ -159,7 +352,9 @@ def validate_task(task_id):
     task.date_validation = datetime.utcnow()
     task.validated_by_id = current_user.id
     
+    publish_task(TASK_VALIDATED, task.id, task.user_id, statut=task.statut)
     db.session.commit()
+    logger.info("Tâche validée", extra={"task_id": task.id, "admin_id": current_user.id})
     
     return jsonify({
         "message": "Tâche validée avec succès",
@@ -167,6 +362,7 @@ def validate_task(task_id):
     }), 200
 
 @task_bp.route("/admin/tasks/<int:task_id>", methods=["DELETE"])
+@query_budget(6)
 @jwt_required()
 def delete_task(task_id):
     """Supprimer une tâche"""
@@ -179,12 +375,108 @@ def delete_task(task_id):
     if not task:
         return jsonify({"error": "Tâche non trouvée"}), 404
     
+    publish_task(TASK_DELETED, task.id, task.user_id)
+    record_tombstones([(task.id, task.user_id)])
     db.session.delete(task)
     db.session.commit()
+    logger.info("Tâche supprimée", extra={"task_id": task_id, "admin_id": current_user.id})
     
     return jsonify({"message": "Tâche supprimée avec succès"}), 200
 
+@task_bp.route("/admin/tasks/bulk/validate", methods=["PUT"])
+@query_budget(5)
+@jwt_required()
+def validate_tasks_bulk():
+    """Valider plusieurs tâches 'terminé' en une requête"""
+    is_admin, current_user = check_admin_access()
+    
+    if not is_admin:
+        return jsonify({"error": "Accès non autorisé"}), 403
+    
+    try:
+        ids = parse_task_ids(request.get_json(silent=True))
+    except BulkRequestError as e:
+        return jsonify({"error": "Lot invalide", "message": str(e)}), 400
+    
+    validated, skipped = validate_tasks(ids)
+    logger.info("Tâches validées en lot", extra={
+        "validated": len(validated), "skipped": len(skipped), "admin_id": current_user.id
+    })
+    
+    return jsonify({
+        "message": f"{len(validated)} tâche(s) validée(s)",
+        "validated": validated,
+        "skipped": skipped
+    }), 200
+
+@task_bp.route("/admin/tasks/bulk", methods=["DELETE"])
+@query_budget(6)
+@jwt_required()
+def delete_tasks_bulk():
+    """Supprimer plusieurs tâches, par liste d'ids ou par filtre (statut, user_id)"""
+    is_admin, current_user = check_admin_access()
+    
+    if not is_admin:
+        return jsonify({"error": "Accès non autorisé"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        if "ids" in data:
+            deleted, skipped = delete_tasks(parse_task_ids(data))
+            logger.info("Tâches supprimées en lot", extra={"deleted": len(deleted), "admin_id": current_user.id})
+            return jsonify({"deleted": len(deleted), "ids": deleted, "skipped": skipped}), 200
+        
+        criteria = parse_delete_filter(data)
+    except BulkRequestError as e:
+        return jsonify({"error": "Lot invalide", "message": str(e)}), 400
+    
+    deleted = delete_tasks_matching(criteria)
+    logger.info("Tâches supprimées par filtre", extra={"deleted": deleted, "admin_id": current_user.id})
+    return jsonify({"deleted": deleted}), 200
+
+@task_bp.route("/admin/stats", methods=["GET"])
+@query_budget(4)
+@jwt_required()
+def get_stats():
+    """Statistiques du tableau de bord (?source=live pour forcer le GROUP BY)
+
+    ?source=counters n'est accepté que si TASK_COUNTERS_ENABLED : sinon
+    task_counters n'est pas tenue à jour et donnerait des chiffres faux (409).
+    """
+    is_admin, current_user = check_admin_access()
+    
+    if not is_admin:
+        return jsonify({"error": "Accès non autorisé"}), 403
+    
+    source = request.args.get("source")
+    if source not in (None, "live", "counters"):
+        return jsonify({"error": "Source invalide", "message": "source doit valoir 'live' ou 'counters'"}), 400
+    if source == "counters" and not counters_enabled():
+        return jsonify({
+            "error": "Compteurs désactivés",
+            "message": "task_counters n'est pas tenue à jour (TASK_COUNTERS_ENABLED=false) : utilisez source=live"
+        }), 409
+    
+    return jsonify(dashboard_stats(source)), 200
+
+@task_bp.route("/admin/pool", methods=["GET"])
+@query_budget(2)
+@jwt_required()
+def get_pool_stats():
+    """État du pool de connexions du worker qui répond (et du réplica s'il existe)"""
+    is_admin, current_user = check_admin_access()
+    
+    if not is_admin:
+        return jsonify({"error": "Accès non autorisé"}), 403
+    
+    stats = pool_stats()
+    replica = replica_stats()
+    if replica is not None:
+        stats["replica"] = replica
+    return jsonify(stats), 200
+
 @task_bp.route("/admin/users/<int:user_id>/tasks", methods=["GET"])
+@query_budget(5)
 @jwt_required()
 def get_user_tasks(user_id):
     """Récupérer les tâches d'un utilisateur spécifique"""
@@ -193,16 +485,16 @@ def get_user_tasks(user_id):
     if not is_admin:
         return jsonify({"error": "Accès non autorisé"}), 403
     
-    user = User.query.get(user_id)
-    if not user or not check_user_role(user, 'user'):
+    user = get_user_entry(user_id=user_id)
+    if not user or user["role"] != 'user':
         return jsonify({"error": "Utilisateur invalide"}), 400
     
-    tasks = Task.query.filter_by(user_id=user_id).order_by(Task.created_at.desc()).all()
-    return jsonify([task.to_dict() for task in tasks]), 200
+    return tasks_response(user_id)
 
 # ============= ROUTES UTILISATEUR =============
 
 @task_bp.route("/user/tasks", methods=["GET"])
+@query_budget(4)
 @jwt_required()
 def get_my_tasks():
     """Récupérer mes tâches"""
@@ -210,10 +502,32 @@ def get_my_tasks():
     if not current_user:
         return jsonify({"error": "Utilisateur non trouvé"}), 404
     
-    tasks = Task.query.filter_by(user_id=current_user.id).order_by(Task.created_at.desc()).all()
-    return jsonify([task.to_dict() for task in tasks]), 200
+    return tasks_response(current_user.id)
+
+@task_bp.route("/user/tasks/search", methods=["GET"])
+@query_budget(3)
+@jwt_required()
+def search_my_tasks():
+    """Rechercher dans mes tâches"""
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    
+    return search_response(current_user.id)
+
+@task_bp.route("/user/tasks/archive", methods=["GET"])
+@query_budget(3)
+@jwt_required()
+def get_my_archived_tasks():
+    """Mes tâches archivées"""
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    
+    return archive_response(current_user.id)
 
 @task_bp.route("/user/tasks/<int:task_id>/status", methods=["PUT"])
+@query_budget(7)
 @jwt_required()
 def update_task_status(task_id):
     """Utilisateur met à jour le statut"""
@@ -228,31 +542,20 @@ def update_task_status(task_id):
     data = request.get_json()
     new_status = data.get("statut")
     
-    print(f"DEBUG update_task_status:")
-    print(f"  Task ID: {task_id}")
-    print(f"  Current status: {task.statut}")
-    print(f"  New status received: {new_status}")
+    logger.debug("Changement de statut demandé", extra={
+        "task_id": task_id, "statut_actuel": task.statut, "statut_demande": new_status
+    })
     
     # Vérifier le statut reçu
-    if new_status not in ['en cours', 'terminé']:
+    if new_status not in TRANSITIONS_UTILISATEUR:
         return jsonify({
             "error": "Statut invalide",
             "message": "Utilisez 'en cours' ou 'terminé'",
-            "statuts_autorisés": ["en cours", "terminé"]
+            "statuts_autorisés": list(TRANSITIONS_UTILISATEUR)
         }), 400
     
-    # Vérifier les transitions autorisées
-    if task.statut == 'à faire' and new_status == 'terminé':
-        # On peut passer directement de "à faire" à "terminé"
-        pass
-    elif task.statut == 'à faire' and new_status == 'en cours':
-        # Normal : à faire → en cours
-        pass
-    elif task.statut == 'en cours' and new_status == 'terminé':
-        # Normal : en cours → terminé
-        pass
-    else:
-        # Transition non autorisée
+    # Vérifier les transitions autorisées (à faire → en cours / terminé, en cours → terminé)
+    if task.statut not in TRANSITIONS_UTILISATEUR[new_status]:
         return jsonify({
             "error": "Transition non autorisée",
             "message": f"Impossible de passer de '{task.statut}' à '{new_status}'",
@@ -267,16 +570,52 @@ def update_task_status(task_id):
     if new_status == 'terminé':
         task.date_fin = datetime.utcnow()
     
+    publish_task(TASK_UPDATED, task.id, task.user_id, statut=task.statut)
     db.session.commit()
     
-    print(f"  SUCCESS: Status updated to {new_status}")
+    logger.info("Statut de tâche modifié", extra={"task_id": task.id, "user_id": current_user.id, "statut": new_status})
     
     return jsonify({
         "message": f"Tâche marquée comme '{new_status}'",
         "task": task.to_dict()
     }), 200
 
+@task_bp.route("/user/tasks/bulk/status", methods=["PUT"])
+@query_budget(5)
+@jwt_required()
+def update_tasks_status_bulk():
+    """Utilisateur passe plusieurs de ses tâches en 'en cours' ou 'terminé'"""
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    
+    data = request.get_json(silent=True) or {}
+    new_status = data.get("statut")
+    if new_status not in TRANSITIONS_UTILISATEUR:
+        return jsonify({
+            "error": "Statut invalide",
+            "message": "Utilisez 'en cours' ou 'terminé'",
+            "statuts_autorisés": list(TRANSITIONS_UTILISATEUR)
+        }), 400
+    
+    try:
+        ids = parse_task_ids(data)
+    except BulkRequestError as e:
+        return jsonify({"error": "Lot invalide", "message": str(e)}), 400
+    
+    updated, skipped = update_user_tasks_status(ids, current_user.id, new_status)
+    logger.info("Statuts modifiés en lot", extra={
+        "updated": len(updated), "skipped": len(skipped), "user_id": current_user.id, "statut": new_status
+    })
+    
+    return jsonify({
+        "message": f"{len(updated)} tâche(s) marquée(s) comme '{new_status}'",
+        "updated": updated,
+        "skipped": skipped
+    }), 200
+
 @task_bp.route("/user/tasks/<int:task_id>/note", methods=["PUT"])
+@query_budget(7)
 @jwt_required()
 def submit_task_note(task_id):
     """Soumettre une note pour une tâche"""
@@ -292,6 +631,7 @@ def submit_task_note(task_id):
     note = data.get("note_utilisateur", "")
     
     task.note_utilisateur = note
+    logger.debug("Note soumise", extra={"task_id": task.id, "longueur": len(note or "")})
     
     # Optionnel : si l'utilisateur soumet une note, on peut automatiquement passer en "terminé"
     # Décommentez si vous voulez cette fonctionnalité :
@@ -299,6 +639,7 @@ def submit_task_note(task_id):
     #     task.statut = 'terminé'
     #     task.date_fin = datetime.utcnow()
     
+    publish_task(TASK_UPDATED, task.id, task.user_id, statut=task.statut)
     db.session.commit()
     
     return jsonify({
@@ -307,17 +648,19 @@ def submit_task_note(task_id):
     }), 200
 
 @task_bp.route("/user/profile", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 def get_my_profile():
     """Récupérer mon profil"""
-    current_user = get_current_user()
+    profile = current_profile()
     
-    if not current_user:
+    if not profile:
         return jsonify({"error": "Utilisateur non trouvé"}), 404
     
-    return jsonify(current_user.to_dict()), 200
+    return json_with_etag(profile)
 
 @task_bp.route("/user/tasks/<int:task_id>", methods=["GET"])
+@query_budget(4)
 @jwt_required()
 def get_my_task(task_id):
     """Récupérer une tâche spécifique"""
@@ -331,16 +674,49 @@ def get_my_task(task_id):
     
     return jsonify(task.to_dict()), 200
 
+# ============= FLUX D'ÉVÉNEMENTS (SSE) =============
+
+@task_bp.route("/events", methods=["GET"])
+@query_budget(2)
+@jwt_required(locations=["headers", "query_string"])
+def task_events():
+    """Flux Server-Sent Events des changements de tâches (admin : toutes, utilisateur : les siennes).
+
+    EventSource ne permet pas d'envoyer d'en-tête : le token peut être passé
+    en ?jwt=<token>. Le navigateur renvoie Last-Event-ID à la reconnexion.
+    503 si le worker a déjà EVENTS_MAX_STREAMS flux ouverts.
+    """
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID invalide"}), 400
+    
+    release = reserve_stream()
+    response = Response(
+        stream_with_context(event_stream(current_user, last_event_id)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    # Appelé par le serveur WSGI à la fin du flux, même si le générateur n'a jamais démarré
+    response.call_on_close(release)
+    return response
+
 # ============= ROUTES DEBUG/UTILITAIRES =============
 
 @task_bp.route("/debug/whoami", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 def debug_whoami():
     """Débogage: voir les infos de l'utilisateur connecté"""
     user_identity = get_jwt_identity()
-    user = User.query.filter_by(email=user_identity).first()
+    profile = current_profile()
     
-    if not user:
+    if not profile:
         return jsonify({
             "error": "Utilisateur non trouvé",
             "email_in_token": user_identity
@@ -348,10 +724,12 @@ def debug_whoami():
     
     return jsonify({
         "email_in_token": user_identity,
-        "user": user.to_dict()
+        "claims": {key: get_jwt().get(key) for key in ("user_id", "email", "role")},
+        "user": profile
     }), 200
 
 @task_bp.route("/admin/test", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 def admin_test():
     """Route de test pour vérifier l'accès admin"""
@@ -365,10 +743,11 @@ def admin_test():
     
     return jsonify({
         "message": "Accès admin autorisé",
-        "user": current_user.to_dict()
+        "user": current_profile()
     }), 200
 
 @task_bp.route("/debug/user/<int:user_id>", methods=["GET"])
+@query_budget(3)
 @jwt_required()
 def debug_user(user_id):
     """Vérifier un utilisateur spécifique"""
@@ -377,13 +756,14 @@ def debug_user(user_id):
     if not is_admin:
         return jsonify({"error": "Accès non autorisé"}), 403
     
-    user = User.query.get(user_id)
+    user = get_user_entry(user_id=user_id)
     if not user:
         return jsonify({"error": f"Utilisateur {user_id} non trouvé"}), 404
     
-    return jsonify(user.to_dict()), 200
+    return jsonify(user["profile"]), 200
 
 @task_bp.route("/debug/task/<int:task_id>", methods=["GET"])
+@query_budget(4)
 @jwt_required()
 def debug_task(task_id):
     """Vérifier une tâche spécifique"""
@@ -0,0 +1,203 @@
+"""Vérifie le nombre de requêtes SQL de chaque route de auth_bp et task_bp.
+
+Le scénario (toutes les routes, dans un ordre fixe) est joué deux fois,
+sur une petite puis sur une grande base SQLite, cache des utilisateurs
+vidé avant chaque appel (cas le plus coûteux, voir services/query_budget.py).
+Pour chaque appel :
+- le nombre de requêtes doit être identique aux deux tailles (sinon le
+  coût dépend du volume : N+1) ;
+- il ne doit pas dépasser le budget déclaré par @query_budget sur la route.
+Le script échoue aussi si une route n'a pas de budget ou n'est pas appelée.
+Les mêmes vérifications tournent sous pytest (tests/test_query_budgets.py).
+
+Utilisation (depuis server/) :
+    python -m scripts.check_query_budgets
+    python -m scripts.check_query_budgets --users 100 --tasks 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from sqlalchemy import insert, select
+
+from app import create_app
+from extensions import db
+from models.role import Role
+from models.task import STATUTS, Task
+from models.user import User
+from services.identity import user_cache
+from services.sync import encode_sync_token
+
+PASSWORD = "budget-password"
+
+# Comptage via l'en-tête X-Query-Budget ; caches et tâches de fond rendus déterministes
+OVERRIDES = {
+    "QUERY_BUDGET_HEADER": True,
+    "BCRYPT_LOG_ROUNDS": 4,
+    "TOKEN_BLOCKLIST_NEGATIVE_TTL": 0,
+    "TOKEN_BLOCKLIST_PURGE_INTERVAL": 10 ** 9,
+    "EVENTS_PURGE_INTERVAL": 10 ** 9,
+    "SYNC_COMPACTION_INTERVAL": 10 ** 9,
+    "EVENTS_STREAM_MAX_SECONDS": 0,
+}
+
+BLUEPRINTS = ("auth", "tasks")
+
+
+def seed(users, tasks):
+    db.create_all()
+    admin_role, user_role = Role(nom="admin"), Role(nom="user")
+    db.session.add_all([admin_role, user_role])
+    db.session.flush()
+    admin = User(nom="Budget", prenom="Admin", email="admin@budget.local", telephone="0100000000",
+                 role_id=admin_role.id)
+    admin.set_password(PASSWORD)
+    db.session.add(admin)
+    db.session.flush()
+    db.session.execute(insert(User), [
+        {"nom": f"User{i}", "prenom": "Budget", "email": f"user{i}@budget.local",
+         "telephone": f"02{i:08d}", "password_hash": admin.password_hash, "role_id": user_role.id}
+        for i in range(users)
+    ])
+    user_ids = list(db.session.scalars(select(User.id).where(User.role_id == user_role.id).order_by(User.id)))
+    db.session.execute(insert(Task), [
+        {"titre": f"Tâche {i}", "description": "budget", "user_id": user_ids[i % users],
+         "assigned_by_id": admin.id, "statut": STATUTS[(i // users) % 3]}
+        for i in range(tasks)
+    ])
+    db.session.commit()
+    return user_ids[0]
+
+
+def scenario(client, user_id):
+    """Appels (méthode, chemin, identité, corps) couvrant chaque route ; identité : "admin", "user" ou None"""
+    def task_ids(statut, count, owner=user_id):
+        return list(db.session.scalars(
+            select(Task.id).where(Task.user_id == owner, Task.statut == statut).order_by(Task.id).limit(count)
+        ))
+
+    todo, doing, done = task_ids("à faire", 4), task_ids("en cours", 2), task_ids("terminé", 4)
+    other = db.session.scalar(select(Task.id).where(Task.user_id != user_id).order_by(Task.id))
+    since = encode_sync_token(db.session.scalar(select(Task.created_at).order_by(Task.created_at)))
+    return [
+        ("POST", "/auth/register", None, {"nom": "Nouveau", "prenom": "Budget", "email": "nouveau@budget.local",
+                                          "telephone": "0300000000", "password": PASSWORD}),
+        ("POST", "/auth/login", None, {"email": "admin@budget.local", "password": PASSWORD}),
+        ("GET", "/auth/me", "admin", None),
+        ("GET", "/auth/users", "admin", None),
+        ("POST", "/auth/admin/create-user", "admin", {"nom": "Cree", "prenom": "Budget", "email": "cree@budget.local",
+                                                      "telephone": "0300000001", "password": PASSWORD}),
+        ("GET", "/api/admin/users", "admin", None),
+        ("GET", "/api/admin/tasks", "admin", None),
+        ("GET", "/api/admin/tasks?limit=20", "admin", None),
+        ("GET", "/api/admin/tasks?fields=id,titre,statut&compact=1", "admin", None),
+        ("GET", f"/api/admin/tasks?since={since}", "admin", None),
+        ("GET", "/api/admin/tasks/search?q=tâche&limit=20", "admin", None),
+        ("GET", "/api/admin/tasks?statut=à faire,en cours&sort=-updated_at&limit=20&count=1", "admin", None),
+        ("GET", f"/api/admin/tasks?user_id={user_id}&valide_par_admin=false&created_after=2000-01-01", "admin", None),
+        ("GET", "/api/admin/tasks/archive?limit=20", "admin", None),
+        ("POST", "/api/admin/tasks", "admin", {"user_id": user_id, "titre": "Nouvelle"}),
+        ("POST", "/api/admin/tasks/bulk", "admin", {"user_ids": [user_id], "titre": "Lot"}),
+        ("PUT", f"/api/admin/tasks/{todo[0]}", "admin", {"titre": "Modifiée", "statut": "en cours"}),
+        ("PUT", f"/api/admin/tasks/{done[0]}/validate", "admin", None),
+        ("PUT", "/api/admin/tasks/bulk/validate", "admin", {"ids": done[1:3]}),
+        ("DELETE", f"/api/admin/tasks/{other}", "admin", None),
+        ("DELETE", "/api/admin/tasks/bulk", "admin", {"ids": [done[3]]}),
+        ("DELETE", "/api/admin/tasks/bulk", "admin", {"filter": {"statut": "validé", "user_id": user_id}}),
+        ("GET", "/api/admin/stats", "admin", None),
+        ("GET", "/api/admin/pool", "admin", None),
+        ("GET", f"/api/admin/users/{user_id}/tasks", "admin", None),
+        ("GET", "/api/user/tasks", "user", None),
+        ("GET", "/api/user/tasks?limit=20", "user", None),
+        ("GET", f"/api/user/tasks?since={since}", "user", None),
+        ("GET", "/api/user/tasks/search?q=tâche", "user", None),
+        ("GET", "/api/user/tasks?statut=à faire&sort=created_at&limit=20", "user", None),
+        ("GET", "/api/user/tasks/archive?validated_before=2100-01-01", "user", None),
+        ("PUT", f"/api/user/tasks/{todo[1]}/status", "user", {"statut": "en cours"}),
+        ("PUT", "/api/user/tasks/bulk/status", "user", {"ids": todo[2:4] + doing, "statut": "terminé"}),
+        ("PUT", f"/api/user/tasks/{todo[1]}/note", "user", {"note_utilisateur": "Fait"}),
+        ("GET", "/api/user/profile", "user", None),
+        ("GET", f"/api/user/tasks/{todo[1]}", "user", None),
+        ("GET", "/api/events", "user", None),
+        ("GET", "/api/debug/whoami", "user", None),
+        ("GET", "/api/admin/test", "admin", None),
+        ("GET", f"/api/debug/user/{user_id}", "admin", None),
+        ("GET", f"/api/debug/task/{todo[1]}", "admin", None),
+        ("POST", "/auth/logout", "user", None),
+    ]
+
+
+def run(users, tasks):
+    """Joue le scénario sur une base neuve ; renvoie [(appel, endpoint, statut, requêtes, budget)]"""
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    tmp.close()
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp.name}", **OVERRIDES})
+    results = []
+    try:
+        with app.app_context():
+            user_id = seed(users, tasks)
+            client = app.test_client()
+            tokens = {}
+            for role, email in (("admin", "admin@budget.local"), ("user", "user0@budget.local")):
+                tokens[role] = client.post("/auth/login", json={"email": email, "password": PASSWORD}).get_json()["token"]
+
+            for method, path, role, body in scenario(client, user_id):
+                user_cache.clear()
+                headers = {"X-Query-Budget": "log"}
+                if role:
+                    headers["Authorization"] = f"Bearer {tokens[role]}"
+                response = client.open(path, method=method, json=body, headers=headers)
+                response.close()
+                endpoint = app.url_map.bind("").match(path.split("?")[0], method=method)[0]
+                budget = response.headers.get("X-Query-Budget")
+                results.append((f"{method} {path}"[:45], endpoint,
+                                response.status_code, int(response.headers["X-Query-Count"]),
+                                int(budget) if budget is not None else None))
+            endpoints = {rule.endpoint for rule in app.url_map.iter_rules()
+                         if rule.endpoint.split(".")[0] in BLUEPRINTS}
+    finally:
+        os.unlink(tmp.name)
+    return results, endpoints
+
+
+def check(small, large, endpoints, verbose=False):
+    """Problèmes relevés sur les résultats de run() aux deux tailles de base"""
+    failures = []
+    if verbose:
+        print(f"{'appel':<46}{'statut':>7}{'petit':>7}{'grand':>7}{'budget':>8}")
+    for (call, endpoint, status, count_small, budget), (_, _, status_large, count_large, _) in zip(small, large):
+        if verbose:
+            print(f"{call:<46}{status:>7}{count_small:>7}{count_large:>7}{budget if budget is not None else '-':>8}")
+        if status >= 400 or status_large >= 400:
+            failures.append(f"{call} : statut {status}/{status_large}")
+        if count_small != count_large:
+            failures.append(f"{call} : {count_small} requêtes sur la petite base, {count_large} sur la grande")
+        if budget is None:
+            failures.append(f"{call} : pas de @query_budget sur {endpoint}")
+        elif max(count_small, count_large) > budget:
+            failures.append(f"{call} : {max(count_small, count_large)} requêtes pour un budget de {budget}")
+
+    missing = endpoints - {endpoint for _, endpoint, _, _, _ in small}
+    failures += [f"{endpoint} : route non couverte par le scénario" for endpoint in sorted(missing)]
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budgets de requêtes SQL par route")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=2000)
+    args = parser.parse_args()
+
+    small, endpoints = run(5, 60)
+    large, _ = run(args.users, args.tasks)
+    failures = check(small, large, endpoints, verbose=True)
+
+    print(f"\n{len(failures)} problème(s)")
+    for failure in failures:
+        print(f"- {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
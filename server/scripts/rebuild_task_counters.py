@@ -0,0 +1,17 @@
+"""Recalcule la table task_counters depuis tasks.
+
+À lancer après avoir activé TASK_COUNTERS_ENABLED sur une base existante,
+ou si les compteurs divergent du GROUP BY (GET /api/admin/stats?source=live).
+
+Utilisation (depuis server/) :
+    python -m scripts.rebuild_task_counters
+"""
+from app import app
+from services.task_stats import dashboard_stats, rebuild_counters
+
+with app.app_context():
+    written = rebuild_counters()
+    print(f"task_counters recalculée ({written} ligne(s))")
+    live, counters = dashboard_stats("live"), dashboard_stats("counters")
+    if live["par_utilisateur"] != counters["par_utilisateur"]:
+        print("ATTENTION : les compteurs diffèrent encore du calcul direct (écritures concurrentes ?)")
@@ -0,0 +1,145 @@
+"""Pool de connexions : options par dialecte et mesure de l'attente.
+
+init_app() complète SQLALCHEMY_ENGINE_OPTIONS avant db.init_app() : les
+variables DB_POOL_* de config.py l'emportent, sinon les valeurs de
+DIALECT_DEFAULTS s'appliquent. Une option déjà présente dans
+SQLALCHEMY_ENGINE_OPTIONS n'est jamais écrasée.
+
+Le pool utilisé est TimedQueuePool, un QueuePool qui mesure le temps
+passé à obtenir une connexion (attente d'une connexion libre ou création)
+et compte les expirations de pool_timeout. pool_stats() expose ces
+mesures avec l'état du pool ; elles sont propres à chaque worker.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from extensions import db
+
+# pool_recycle sous les délais de coupure des connexions inactives :
+# Render Postgres / proxys ~5 min, MySQL wait_timeout 8 h
+DIALECT_DEFAULTS = {
+    "postgresql": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 10, "pool_recycle": 280, "pool_pre_ping": True},
+    "mysql": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 10, "pool_recycle": 3600, "pool_pre_ping": True},
+    "sqlite": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 10},
+}
+
+# Clés de config.py -> options du moteur
+CONFIG_OPTIONS = {
+    "DB_POOL_SIZE": "pool_size",
+    "DB_MAX_OVERFLOW": "max_overflow",
+    "DB_POOL_TIMEOUT": "pool_timeout",
+    "DB_POOL_RECYCLE": "pool_recycle",
+    "DB_POOL_PRE_PING": "pool_pre_ping",
+}
+
+# Nombre de mesures conservées pour les percentiles
+WAIT_SAMPLES = 1024
+
+
+class PoolWaitStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms):
+        with self._lock:
+            self.checkouts += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self._samples.append(elapsed_ms)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_ms": self.total_ms / self.checkouts if self.checkouts else 0.0,
+                "p95_ms": samples[int(len(samples) * 0.95)] if samples else 0.0,
+                "max_ms": self.max_ms,
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool qui mesure la durée d'obtention d'une connexion"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record_timeout()
+            raise
+        self.wait_stats.record((time.perf_counter() - start) * 1000)
+        return connection
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(app, uri=None, options=None):
+    """Options du moteur pour uri (par défaut celle de l'application), sans modifier la config"""
+    url = make_url(uri or app.config["SQLALCHEMY_DATABASE_URI"])
+    if options is None:
+        options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    options = dict(options)
+    if _is_memory_sqlite(url):
+        # Flask-SQLAlchemy impose StaticPool : une seule connexion partagée
+        return options
+
+    defaults = dict(DIALECT_DEFAULTS.get(url.get_backend_name(), {}))
+    for key, option in CONFIG_OPTIONS.items():
+        if app.config.get(key) is not None:
+            defaults[option] = app.config[key]
+    for option, value in defaults.items():
+        options.setdefault(option, value)
+    options.setdefault("poolclass", TimedQueuePool)
+    return options
+
+
+def init_app(app):
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app)
+
+
+def pool_stats(engine=None):
+    """État du pool d'un moteur (par défaut le principal) pour ce worker"""
+    engine = engine or db.engine
+    pool = engine.pool
+    stats = {
+        "pid": os.getpid(),
+        "dialect": engine.dialect.name,
+        "pool_class": type(pool).__name__,
+    }
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+            "recycle": pool._recycle,
+            "pre_ping": pool._pre_ping,
+        })
+    if isinstance(pool, TimedQueuePool):
+        stats["wait"] = pool.wait_stats.snapshot()
+    return stats
@@ -0,0 +1,258 @@
+"""Diffusion des changements de tâches (flux SSE /api/events).
+
+Les routes d'écriture enregistrent leurs événements dans la même
+transaction que la modification ; ils ne sont visibles qu'après le
+commit. Deux diffuseurs (EVENTS_BACKEND) :
+
+- "database" (défaut) : table task_events, lue par chaque flux toutes les
+  EVENTS_POLL_INTERVAL secondes. Fonctionne entre workers gunicorn sans
+  broker externe ; les flux du worker qui a écrit sont réveillés aussitôt.
+- "memory" : tampon circulaire local au processus (un seul worker, tests).
+
+Périmètre : un admin reçoit tous les événements, un utilisateur ceux de
+ses propres tâches.
+
+Chaque flux ouvert occupe un thread du worker gunicorn (gthread) pendant
+EVENTS_STREAM_MAX_SECONDS : au-delà de EVENTS_MAX_STREAMS flux dans un
+worker (par défaut la moitié de GUNICORN_THREADS), /api/events répond 503
++ Retry-After pour que les autres routes gardent des threads libres.
+"""
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, event, func, insert, literal, select
+
+from extensions import db
+from models.task import Task
+from models.task_event import TaskEvent
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_VALIDATED = "task.validated"
+TASK_DELETED = "task.deleted"
+TASK_ARCHIVED = "task.archived"
+
+_PENDING_KEY = "task_events_pending"
+
+
+class TooManyStreams(Exception):
+    """Plus de place pour un flux SSE dans ce worker : le client doit réessayer"""
+
+
+class MemoryBroadcaster:
+    """Événements gardés en mémoire (EVENTS_BUFFER_SIZE derniers)"""
+
+    def __init__(self, app):
+        self.poll_interval = app.config.get("EVENTS_POLL_INTERVAL", 2)
+        self._events = deque(maxlen=app.config.get("EVENTS_BUFFER_SIZE", 1000))
+        self._last_id = 0
+        self._condition = threading.Condition()
+
+    def record(self, events):
+        """Ajoute des événements à la transaction courante"""
+        db.session.info.setdefault(_PENDING_KEY, []).extend(events)
+
+    def record_matching(self, event_type, criteria):
+        """Un événement par tâche vérifiant criteria (à appeler avant l'écriture)"""
+        rows = db.session.execute(select(Task.id, Task.user_id, Task.statut).where(*criteria)).all()
+        self.record([_event(event_type, task_id, user_id, {"statut": statut})
+                     for task_id, user_id, statut in rows])
+
+    def committed(self, events):
+        with self._condition:
+            for item in events:
+                self._last_id += 1
+                self._events.append({**item, "id": self._last_id})
+            self._condition.notify_all()
+
+    def last_id(self):
+        return self._last_id
+
+    def fetch(self, after_id, user_id=None, limit=100, exclude=()):
+        """Événements d'id > after_id, hors ids déjà envoyés (exclude)"""
+        events = [e for e in list(self._events)
+                  if e["id"] > after_id and e["id"] not in exclude
+                  and (user_id is None or e["user_id"] == user_id)]
+        return events[:limit]
+
+    def wait(self, timeout):
+        with self._condition:
+            self._condition.wait(timeout)
+
+
+class DatabaseBroadcaster(MemoryBroadcaster):
+    """Événements stockés dans task_events, partagés entre les workers"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.retention = timedelta(seconds=app.config.get("EVENTS_RETENTION", 3600))
+        self.purge_interval = app.config.get("EVENTS_PURGE_INTERVAL", 300)
+        self._last_purge = 0.0
+
+    def record(self, events):
+        if not events:
+            return
+        db.session.execute(insert(TaskEvent), [
+            {"event_type": e["type"], "task_id": e["task_id"], "user_id": e["user_id"],
+             "payload": json.dumps(e["data"]), "created_at": datetime.utcnow()}
+            for e in events
+        ])
+        db.session.info[_PENDING_KEY] = db.session.info.get(_PENDING_KEY, [])
+
+    def record_matching(self, event_type, criteria):
+        # INSERT ... SELECT : aucune tâche chargée côté Python
+        db.session.execute(insert(TaskEvent).from_select(
+            ["event_type", "task_id", "user_id", "payload", "created_at"],
+            select(literal(event_type), Task.id, Task.user_id, literal(None), literal(datetime.utcnow()))
+            .where(*criteria)
+        ))
+        db.session.info[_PENDING_KEY] = db.session.info.get(_PENDING_KEY, [])
+
+    def committed(self, events):
+        with self._condition:
+            self._condition.notify_all()
+        if time.monotonic() - self._last_purge > self.purge_interval:
+            self.purge_expired()
+
+    def last_id(self):
+        last = db.session.scalar(select(func.max(TaskEvent.id)))
+        db.session.commit()
+        return last or 0
+
+    def fetch(self, after_id, user_id=None, limit=100, exclude=()):
+        stmt = select(TaskEvent).where(TaskEvent.id > after_id).order_by(TaskEvent.id).limit(limit)
+        if exclude:
+            stmt = stmt.where(TaskEvent.id.notin_(list(exclude)))
+        if user_id is not None:
+            stmt = stmt.where(TaskEvent.user_id == user_id)
+        events = [{
+            "id": row.id,
+            "type": row.event_type,
+            "task_id": row.task_id,
+            "user_id": row.user_id,
+            "data": json.loads(row.payload) if row.payload else {},
+        } for row in db.session.scalars(stmt)]
+        # Termine la transaction : la connexion retourne au pool entre deux lectures
+        db.session.commit()
+        return events
+
+    def wait(self, timeout):
+        super().wait(min(timeout, self.poll_interval))
+
+    def purge_expired(self):
+        self._last_purge = time.monotonic()
+        with db.engine.begin() as connection:
+            connection.execute(delete(TaskEvent).where(TaskEvent.created_at < datetime.utcnow() - self.retention))
+
+
+BACKENDS = {
+    "database": DatabaseBroadcaster,
+    "memory": MemoryBroadcaster,
+}
+
+
+def init_app(app):
+    backend = app.config.get("EVENTS_BACKEND", "database")
+    if backend not in BACKENDS:
+        raise ValueError(f"EVENTS_BACKEND inconnu : {backend}")
+    app.extensions["task_events"] = BACKENDS[backend](app)
+    app.extensions["task_event_streams"] = threading.BoundedSemaphore(app.config.get("EVENTS_MAX_STREAMS", 4))
+    app.register_error_handler(TooManyStreams, _too_many_streams_response)
+
+
+def get_broadcaster():
+    return current_app.extensions["task_events"]
+
+
+def reserve_stream():
+    """Réserve une place de flux SSE dans ce worker ; renvoie la fonction qui la libère"""
+    slots = current_app.extensions["task_event_streams"]
+    if not slots.acquire(blocking=False):
+        raise TooManyStreams()
+    return slots.release
+
+
+def _too_many_streams_response(error):
+    return {
+        "error": "Serveur occupé",
+        "message": "Trop de flux temps réel ouverts, veuillez réessayer plus tard"
+    }, 503, {"Retry-After": "30"}
+
+
+def _event(event_type, task_id, user_id, data=None):
+    return {"type": event_type, "task_id": task_id, "user_id": user_id, "data": data or {}}
+
+
+def publish_task(event_type, task_id, user_id, **data):
+    """Enregistre un événement sur une tâche (diffusé au commit)"""
+    get_broadcaster().record([_event(event_type, task_id, user_id, data)])
+
+
+def publish_tasks(event_type, tasks):
+    """Enregistre un événement par tâche ; tasks : [(task_id, user_id, data), ...]"""
+    get_broadcaster().record([_event(event_type, task_id, user_id, data) for task_id, user_id, data in tasks])
+
+
+def publish_matching(event_type, *criteria):
+    """Enregistre un événement par tâche vérifiant criteria (avant un DELETE ensembliste)"""
+    get_broadcaster().record_matching(event_type, criteria)
+
+
+@event.listens_for(db.session, "after_commit")
+def _broadcast_committed(session):
+    events = session.info.pop(_PENDING_KEY, None)
+    if events is not None:
+        get_broadcaster().committed(events)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _drop_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def format_sse(item):
+    data = current_app.json.dumps({
+        "type": item["type"], "task_id": item["task_id"], "user_id": item["user_id"], **item["data"]
+    })
+    return f"id: {item['id']}\nevent: {item['type']}\ndata: {data}\n\n"
+
+
+def event_stream(identity, last_event_id=None):
+    """Générateur SSE ; s'arrête après EVENTS_STREAM_MAX_SECONDS (le navigateur se reconnecte)"""
+    broadcaster = get_broadcaster()
+    config = current_app.config
+    heartbeat = config.get("EVENTS_HEARTBEAT", 15)
+    deadline = time.monotonic() + config.get("EVENTS_STREAM_MAX_SECONDS", 300)
+    reorder_window = config.get("EVENTS_REORDER_WINDOW", 10)
+    user_filter = None if identity.is_admin else identity.id
+
+    # Les ids sont attribués à l'INSERT, pas au commit : une transaction plus lente peut rendre
+    # visible un id inférieur au dernier envoyé. On relit donc depuis floor (dernier id envoyé
+    # il y a plus de EVENTS_REORDER_WINDOW secondes) en excluant les ids déjà envoyés.
+    floor = broadcaster.last_id() if last_event_id is None else last_event_id
+    delivered = {}  # id -> instant d'envoi
+    yield "retry: 3000\n\n"
+
+    last_sent = time.monotonic()
+    while time.monotonic() < deadline:
+        events = broadcaster.fetch(floor, user_filter, exclude=delivered)
+        now = time.monotonic()
+        for item in events:
+            delivered[item["id"]] = now
+            yield format_sse(item)
+        expired = [event_id for event_id, sent in delivered.items() if now - sent >= reorder_window]
+        if expired:
+            floor = max(floor, *expired)
+            delivered = {event_id: sent for event_id, sent in delivered.items() if event_id > floor}
+        if events:
+            last_sent = time.monotonic()
+            continue
+
+        if time.monotonic() - last_sent >= heartbeat:
+            yield ": ping\n\n"
+            last_sent = time.monotonic()
+        broadcaster.wait(min(heartbeat, max(0.0, deadline - time.monotonic())))
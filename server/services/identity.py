@@ -0,0 +1,125 @@
+"""Identité et rôle de l'utilisateur connecté, le plus souvent sans requête SQL.
+
+Le token émis par /auth/login porte user_id, email et role dans ses
+claims. Le rôle fait foi dans un cache par worker (clé user_id), qui
+garde aussi le profil sérialisé ; en cas d'absence, l'utilisateur est
+relu en base (une requête sur la clé primaire). Le claim role ne sert
+pas au contrôle d'accès : un utilisateur rétrogradé ou supprimé perd
+ses droits sans attendre l'expiration du token. Le cache est invalidé dès qu'un
+utilisateur est créé, modifié ou supprimé dans ce worker, et expire
+après USER_CACHE_TTL secondes pour que les autres workers finissent par
+voir la modification.
+"""
+import json
+
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+
+from models.user import User
+from utils.ttl_cache import TTLCache
+
+user_cache = TTLCache(ttl=300, maxsize=10000)
+
+
+class Identity:
+    """Utilisateur connecté tel que décrit par le token"""
+
+    __slots__ = ("id", "email", "role")
+
+    def __init__(self, user_id, email, role):
+        self.id = user_id
+        self.email = email
+        self.role = role
+
+    @property
+    def is_admin(self):
+        return self.role == "admin"
+
+
+def init_app(app):
+    user_cache.ttl = app.config.get("USER_CACHE_TTL", 300)
+
+
+def identity_claims(user):
+    """Claims ajoutés au token à la connexion"""
+    return {
+        "user_id": user.id,
+        "email": user.email,
+        "role": user.role.nom.lower() if user.role else None,
+    }
+
+
+def cache_user(user):
+    """Met en cache le rôle et le profil d'un utilisateur déjà chargé"""
+    entry = {
+        "id": user.id,
+        "email": user.email,
+        "role": user.role.nom.lower() if user.role else None,
+        "profile": user.to_dict(),
+    }
+    user_cache.set(user.id, entry)
+    return entry
+
+
+def _user_key(user_id):
+    # Clé du cache : les identifiants lus dans un token ou une URL peuvent être des chaînes
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_user_entry(user_id=None, email=None):
+    """Renvoie {id, email, role, profile} depuis le cache, ou la base en cas d'absence"""
+    if user_id is not None:
+        user_id = _user_key(user_id)
+        if user_id is None:
+            return None
+        entry = user_cache.get(user_id)
+        if entry is not None:
+            return entry
+        query = User.query.filter_by(id=user_id)
+    elif email:
+        query = User.query.filter_by(email=email)
+    else:
+        return None
+
+    user = query.options(joinedload(User.role)).first()
+    return cache_user(user) if user else None
+
+
+def current_identity():
+    """Identité du porteur du token courant (None si l'utilisateur n'existe plus)"""
+    user_id = get_jwt().get("user_id")
+
+    if user_id is not None:
+        # Cache, sinon relecture de l'utilisateur : jamais le rôle du token seul
+        entry = get_user_entry(user_id=user_id)
+    else:
+        # Anciens tokens (avant l'ajout des claims) : identité JSON ou email brut
+        identity = get_jwt_identity()
+        try:
+            email = json.loads(identity).get("email")
+        except (TypeError, ValueError, AttributeError):
+            email = identity
+        entry = get_user_entry(email=email)
+    if entry is None:
+        return None
+    return Identity(entry["id"], entry["email"], entry["role"])
+
+
+def current_profile():
+    """Profil (User.to_dict()) de l'utilisateur connecté"""
+    identity = current_identity()
+    if identity is None:
+        return None
+    entry = get_user_entry(user_id=identity.id)
+    return entry["profile"] if entry else None
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
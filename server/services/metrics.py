@@ -0,0 +1,135 @@
+"""Métriques Prometheus exposées sur /metrics.
+
+Par requête : nombre et durée par route (endpoint Flask, ex. "tasks.get_my_tasks"),
+taille de la réponse envoyée, nombre et durée des requêtes SQL (hooks
+before/after_cursor_execute sur tous les moteurs, réplica compris).
+Hors requête : durée des hachages bcrypt (attente du pool comprise).
+
+Sous gunicorn, chaque worker écrit ses valeurs dans PROMETHEUS_MULTIPROC_DIR
+(créé par gunicorn.conf.py) et /metrics agrège tous les workers, quel
+que soit celui qui répond. Sans cette variable (python app.py), les
+métriques sont celles du processus courant.
+"""
+import hmac
+import os
+import time
+
+from flask import Response, current_app, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from services.passwords import password_hasher
+
+REQUESTS = Counter(
+    "notejour_http_requests_total", "Requêtes HTTP traitées",
+    ["method", "endpoint", "status"],
+)
+REQUEST_SECONDS = Histogram(
+    "notejour_http_request_duration_seconds", "Durée de traitement des requêtes",
+    ["method", "endpoint"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPONSE_BYTES = Histogram(
+    "notejour_http_response_size_bytes", "Taille des réponses envoyées (après compression)",
+    ["method", "endpoint"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+DB_QUERIES = Histogram(
+    "notejour_db_queries_per_request", "Requêtes SQL exécutées par requête HTTP",
+    ["endpoint"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_SECONDS = Histogram(
+    "notejour_db_query_duration_seconds_per_request", "Temps SQL cumulé par requête HTTP",
+    ["endpoint"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "notejour_password_hash_duration_seconds", "Durée des hachages bcrypt (attente du pool comprise)",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+def _endpoint():
+    return request.endpoint or "inconnu"
+
+
+def _measuring():
+    return has_request_context() and "metrics_start" in g
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _measuring():
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if starts and _measuring():
+        g.metrics_db_queries += 1
+        g.metrics_db_seconds += time.perf_counter() - starts.pop()
+
+
+def _observe_password_hash(operation, seconds):
+    PASSWORD_HASH_SECONDS.labels(operation).observe(seconds)
+
+
+def registry():
+    """Registre à exporter : agrégat des workers en mode multiprocessus"""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    collector_registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collector_registry)
+    return collector_registry
+
+
+def metrics_view():
+    """Refusé tant que METRICS_TOKEN n'est pas défini"""
+    token = current_app.config.get("METRICS_TOKEN")
+    if not token:
+        return {"error": "Accès non autorisé", "message": "METRICS_TOKEN non configuré"}, 403
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return {"error": "Accès non autorisé", "message": "Token de métriques invalide"}, 403
+    return Response(generate_latest(registry()), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    """À appeler avant les autres extensions à after_request (compression) :
+    les hooks after_request s'exécutent dans l'ordre inverse, la taille
+    mesurée est donc celle réellement envoyée."""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    if _observe_password_hash not in password_hasher.observers:
+        password_hasher.observers.append(_observe_password_hash)
+
+    @app.before_request
+    def _start_timer():
+        if request.endpoint != "metrics":
+            g.metrics_start = time.perf_counter()
+            g.metrics_db_queries = 0
+            g.metrics_db_seconds = 0.0
+
+    @app.after_request
+    def _record(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        endpoint, method = _endpoint(), request.method
+        REQUESTS.labels(method, endpoint, str(response.status_code)).inc()
+        REQUEST_SECONDS.labels(method, endpoint).observe(time.perf_counter() - start)
+        # Flux (SSE) : taille inconnue, la durée mesurée est celle jusqu'au début du flux
+        if response.content_length is not None:
+            RESPONSE_BYTES.labels(method, endpoint).observe(response.content_length)
+        DB_QUERIES.labels(endpoint).observe(g.metrics_db_queries)
+        DB_SECONDS.labels(endpoint).observe(g.metrics_db_seconds)
+        return response
+
+    app.add_url_rule("/metrics", "metrics", metrics_view)
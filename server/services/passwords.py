@@ -0,0 +1,99 @@
+"""Hachage bcrypt hors du thread de la requête.
+
+bcrypt libère le GIL pendant le calcul : les hachages sont exécutés dans
+un pool de threads borné (PASSWORD_HASH_WORKERS) pour qu'une rafale de
+connexions ne sature pas le CPU au détriment des autres routes. Au-delà
+de PASSWORD_HASH_MAX_PENDING hachages en cours ou en attente, la requête
+est refusée immédiatement (503 + Retry-After) au lieu de s'empiler ; de
+même si le hachage n'est pas terminé après PASSWORD_HASH_TIMEOUT secondes.
+
+Le coût bcrypt vient de BCRYPT_LOG_ROUNDS ; un mot de passe haché avec un
+autre coût est re-haché de façon transparente à la connexion.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from extensions import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Trop de hachages en attente : le client doit réessayer"""
+
+
+class PasswordHasher:
+
+    def __init__(self):
+        self.rounds = 12
+        self.timeout = 10
+        self._executor = None
+        self._slots = None
+        # Fonctions appelées avec (opération, durée en secondes) après chaque hachage
+        self.observers = []
+
+    def init_app(self, app):
+        self.rounds = app.config.get("BCRYPT_LOG_ROUNDS", 12)
+        self.timeout = app.config.get("PASSWORD_HASH_TIMEOUT", 10)
+        workers = app.config.get("PASSWORD_HASH_WORKERS", 4)
+        max_pending = app.config.get("PASSWORD_HASH_MAX_PENDING", workers * 8)
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+            self._slots = threading.BoundedSemaphore(max_pending)
+        else:
+            # 0 worker : hachage directement dans le thread de la requête
+            self._executor = None
+            self._slots = None
+
+        app.register_error_handler(PasswordHasherBusy, _busy_response)
+
+    def _timed(self, operation, fn, *args):
+        start = time.perf_counter()
+        try:
+            return self._run(fn, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            for observer in self.observers:
+                observer(operation, elapsed)
+
+    def _run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Pool saturé : le hachage encore en file n'est pas calculé pour rien
+            future.cancel()
+            raise PasswordHasherBusy() from None
+
+    def hash(self, password):
+        return self._timed("hash", bcrypt.generate_password_hash, password, self.rounds).decode("utf-8")
+
+    def verify(self, password_hash, password):
+        return self._timed("verify", bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Vrai si le hash a été calculé avec un autre coût que BCRYPT_LOG_ROUNDS"""
+        # Format bcrypt : $2b$12$<sel+hash>
+        parts = password_hash.split("$")
+        try:
+            return int(parts[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+def _busy_response(error):
+    return {"error": "Serveur occupé, veuillez réessayer dans un instant"}, 503, {"Retry-After": "1"}
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,93 @@
+"""Budget de requêtes SQL par route, contre le retour des N+1.
+
+Chaque route déclare son budget avec @query_budget(n), placé sous
+@<bp>.route : n est le nombre maximal de requêtes SQL d'un appel, caches
+froids compris (liste des tokens révoqués, utilisateurs). n est fixé
+exactement à ce coût mesuré, sans marge de plus, volontairement : une
+requête ajoutée fait échouer tests/test_query_budgets.py et doit être
+assumée en relevant le budget dans le même changement. Caches chauds
+(cas courant), une route reste une à deux requêtes sous son budget.
+Le comptage est désactivé par défaut (QUERY_BUDGET_MODE="off") :
+- "log"   : la réponse porte X-Query-Count et un dépassement est journalisé
+            avec les requêtes exécutées ;
+- "raise" : la requête SQL qui dépasse le budget lève QueryBudgetExceeded
+            (la trace désigne le code fautif).
+Avec QUERY_BUDGET_HEADER actif, l'en-tête X-Query-Budget: log|raise
+choisit le mode pour une seule requête (scripts/check_query_budgets.py).
+"""
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MODES = ("off", "log", "raise")
+
+# Requêtes conservées pour le message de dépassement
+MAX_LOGGED_STATEMENTS = 30
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Une route a exécuté plus de requêtes SQL que son budget"""
+
+
+def query_budget(limit):
+    """Déclare le nombre maximal de requêtes SQL de la route décorée"""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def _exceeded_message(state):
+    return (f"{request.method} {request.path} ({request.endpoint}) : {state['count']} requêtes SQL "
+            f"pour un budget de {state['limit']}\n  " + "\n  ".join(state["statements"]))
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    state = g.get("query_budget") if has_request_context() else None
+    if state is None:
+        return
+    state["count"] += 1
+    if len(state["statements"]) < MAX_LOGGED_STATEMENTS:
+        state["statements"].append(" ".join(statement.split())[:200])
+    if state["mode"] == "raise" and state["limit"] is not None and state["count"] > state["limit"]:
+        raise QueryBudgetExceeded(_exceeded_message(state))
+
+
+def _request_mode(app):
+    header = request.headers.get("X-Query-Budget")
+    if header in MODES and app.config.get("QUERY_BUDGET_HEADER", False):
+        return header
+    return app.config.get("QUERY_BUDGET_MODE", "off")
+
+
+def init_app(app):
+    mode = app.config.get("QUERY_BUDGET_MODE", "off")
+    if mode not in MODES:
+        raise ValueError(f"QUERY_BUDGET_MODE inconnu : {mode}")
+    if not event.contains(Engine, "before_cursor_execute", _count_query):
+        event.listen(Engine, "before_cursor_execute", _count_query)
+
+    @app.before_request
+    def _start_counting():
+        mode = _request_mode(app)
+        if mode == "off":
+            return
+        view = app.view_functions.get(request.endpoint)
+        g.query_budget = {
+            "mode": mode,
+            "limit": getattr(view, "query_budget", None),
+            "count": 0,
+            "statements": [],
+        }
+
+    @app.after_request
+    def _check_budget(response):
+        state = g.pop("query_budget", None)
+        if state is None:
+            return response
+        response.headers["X-Query-Count"] = str(state["count"])
+        if state["limit"] is not None:
+            response.headers["X-Query-Budget"] = str(state["limit"])
+            if state["count"] > state["limit"]:
+                current_app.logger.warning("Budget de requêtes dépassé : %s", _exceeded_message(state))
+        return response
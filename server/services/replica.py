@@ -0,0 +1,83 @@
+"""Lectures sur un réplica (DATABASE_REPLICA_URL), écritures sur le primaire.
+
+Sans DATABASE_REPLICA_URL, rien ne change. Avec, les requêtes GET/HEAD
+lisent sur le réplica (voir utils/routing_session.py), sauf pendant
+REPLICA_STICKY_SECONDS après une écriture réussie du même client, pour
+qu'il voie immédiatement ce qu'il vient de modifier malgré le retard de
+réplication. La réponse à l'écriture porte la fin de cette fenêtre dans
+l'en-tête X-DB-Primary-Until, que le frontend renvoie tel quel sur ses
+requêtes suivantes : le frontend (Netlify) et l'API (Render) sont sur
+des sites différents, un cookie SameSite ne serait pas envoyé par fetch.
+Le même instant est aussi posé en cookie pour les clients du même site.
+
+Les lectures de synchronisation (?since=) passent toujours par le
+primaire (use_primary(), appelé par services/sync.py).
+"""
+import time
+
+from flask import g, has_request_context, request
+
+from extensions import db
+from services.db_pool import engine_options, pool_stats
+from utils.routing_session import REPLICA_BIND
+
+STICKY_COOKIE = "db_primary_until"
+STICKY_HEADER = "X-DB-Primary-Until"
+READ_METHODS = ("GET", "HEAD")
+
+
+def replica_url(app):
+    url = app.config.get("DATABASE_REPLICA_URL")
+    # Même correction que pour DATABASE_URL (Render fournit postgres://)
+    if url and url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def _sticky(now):
+    # Valeur forgée par le client : au pire, ses lectures vont au primaire
+    for value in (request.headers.get(STICKY_HEADER), request.cookies.get(STICKY_COOKIE)):
+        try:
+            if value and float(value) > now:
+                return True
+        except ValueError:
+            pass
+    return False
+
+
+def use_primary():
+    """Lectures suivantes de la requête sur le primaire (retard de réplication intolérable)"""
+    if has_request_context():
+        g.db_read_replica = False
+
+
+def init_app(app):
+    """À appeler avant db.init_app : déclare le réplica dans SQLALCHEMY_BINDS"""
+    url = replica_url(app)
+    if not url:
+        return
+    # Les options générales ne s'appliquent pas aux binds : on les recopie
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    binds[REPLICA_BIND] = {"url": url, **engine_options(app, url)}
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+    @app.before_request
+    def _route_reads():
+        g.db_read_replica = request.method in READ_METHODS and not _sticky(time.time())
+
+    @app.after_request
+    def _stick_to_primary(response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            seconds = app.config.get("REPLICA_STICKY_SECONDS", 5)
+            until = f"{time.time() + seconds:.3f}"
+            response.headers[STICKY_HEADER] = until
+            response.set_cookie(STICKY_COOKIE, until, max_age=int(seconds) + 1,
+                                httponly=True, samesite="Lax", secure=request.is_secure)
+        return response
+
+
+def replica_stats():
+    """État du pool du réplica, ou None s'il n'est pas configuré"""
+    if REPLICA_BIND not in db.engines:
+        return None
+    return pool_stats(db.engines[REPLICA_BIND])
@@ -0,0 +1,225 @@
+"""Jeu de données synthétique pour le profilage et les benchmarks.
+
+Les lignes sont générées par lots (chunk_size) sous forme de tuples et
+chargées sans objets ORM ni traitement des paramètres par SQLAlchemy
+(coûteux à un million de lignes) : COPY sous PostgreSQL, executemany du
+pilote sous SQLite, INSERT multi-lignes de SQLAlchemy ailleurs. Au-delà
+de DEFER_INDEXES_MIN tâches, les index secondaires de tasks et l'index de
+recherche (services/task_search.py) sont suspendus pendant le chargement
+puis reconstruits. Le mot de passe est haché une seule fois et partagé
+par tous les comptes ; le même seed sur une base vide produit toujours
+les mêmes données.
+
+Les tâches sont réparties sur les days derniers jours : plus une tâche
+est ancienne, plus elle a de chances d'être terminée ou validée.
+"""
+import csv
+import io
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, func, insert, select
+
+from extensions import db
+from models.role import Role
+from models.task import STATUTS, Task
+from models.user import User
+from services.passwords import password_hasher
+from services.task_search import deferred_search_index
+from services.task_stats import rebuild_counters
+
+DEFAULT_PASSWORD = "password123"
+
+# Nombre de tâches à partir duquel recréer les index coûte moins que les maintenir
+DEFER_INDEXES_MIN = 100000
+
+PRENOMS = ("Awa", "Moussa", "Fatou", "Ibrahim", "Mariam", "Oumar", "Aminata", "Seydou", "Kadiatou",
+           "Bakary", "Claire", "Julien", "Sophie", "Thomas", "Camille", "Nicolas", "Léa", "Hugo")
+NOMS = ("Traoré", "Diallo", "Coulibaly", "Keïta", "Koné", "Sangaré", "Cissé", "Touré", "Martin",
+        "Bernard", "Dubois", "Durand", "Lefebvre", "Moreau", "Laurent", "Simon", "Michel", "Garcia")
+TITRES = tuple(f"{action} {objet}" for action in (
+    "Préparer", "Relire", "Mettre à jour", "Envoyer", "Vérifier", "Corriger", "Planifier", "Archiver",
+    "Rédiger", "Valider"
+) for objet in (
+    "le rapport mensuel", "la facture client", "le planning de l'équipe", "la fiche produit",
+    "le compte rendu de réunion", "l'inventaire", "la présentation", "le devis", "le budget",
+    "la documentation"
+))
+
+# Poids des statuts (dans l'ordre de STATUTS) pour une tâche récente et pour la plus ancienne,
+# interpolés sur AGE_BUCKETS tranches d'âge
+RECENT_WEIGHTS = (6, 3, 1, 0)
+OLD_WEIGHTS = (1, 1, 2, 6)
+AGE_BUCKETS = 20
+
+USER_COLUMNS = ("nom", "prenom", "email", "telephone", "password_hash", "role_id", "created_at", "updated_at")
+TASK_COLUMNS = ("titre", "description", "statut", "note_utilisateur", "valide_par_admin", "date_validation",
+                "created_at", "updated_at", "user_id", "assigned_by_id")
+
+
+def ensure_roles():
+    """Crée les rôles admin et user s'ils manquent ; renvoie {nom: id}"""
+    roles = dict(db.session.execute(select(Role.nom, Role.id)).all())
+    for nom in ("admin", "user"):
+        if nom not in roles:
+            role = Role(nom=nom)
+            db.session.add(role)
+            db.session.flush()
+            roles[nom] = role.id
+    return roles
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _load_core(connection, table, columns, chunk):
+    connection.execute(insert(table), [dict(zip(columns, row)) for row in chunk])
+
+
+def _load_sqlite(connection, table, columns, chunk):
+    # Dates au format écrit par SQLAlchemy pour SQLite
+    dates = [i for i, name in enumerate(columns) if isinstance(table.c[name].type, DateTime)]
+    for row_index, row in enumerate(chunk):
+        row = list(row)
+        for i in dates:
+            if row[i] is not None:
+                row[i] = row[i].isoformat(" ", "microseconds")
+        chunk[row_index] = tuple(row)
+    placeholders = ", ".join("?" * len(columns))
+    connection.exec_driver_sql(f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})", chunk)
+
+
+def _load_postgresql(connection, table, columns, chunk):
+    buffer = io.StringIO()
+    # En CSV, un champ vide non cité vaut NULL
+    csv.writer(buffer).writerows(chunk)
+    buffer.seek(0)
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+LOADERS = {
+    "sqlite": _load_sqlite,
+    "postgresql": _load_postgresql,
+}
+
+
+def _load(table, columns, rows, chunk_size):
+    connection = db.session.connection()
+    load = LOADERS.get(connection.dialect.name, _load_core)
+    total = 0
+    for chunk in _chunks(rows, chunk_size):
+        load(connection, table, columns, chunk)
+        total += len(chunk)
+    return total
+
+
+@contextmanager
+def _deferred_indexes(table, enabled):
+    """Supprime les index secondaires de table le temps du bloc, puis les recrée"""
+    connection = db.session.connection()
+    # MySQL peut s'appuyer sur ces index pour les clés étrangères : on les garde
+    indexes = [index for index in table.indexes if not index.unique] \
+        if enabled and connection.dialect.name != "mysql" else []
+    for index in indexes:
+        index.drop(connection, checkfirst=True)
+    yield
+    for index in indexes:
+        index.create(connection)
+
+
+def _user_rows(start, count, role_id, kind, domain, password_hash, rng, now):
+    # Téléphone sur 10 chiffres, unique par numéro de compte (admins et utilisateurs séparés)
+    prefix = "06" if kind == "admin" else "07"
+    for n in range(start, start + count):
+        created_at = now - timedelta(days=rng.uniform(0, 365))
+        yield (rng.choice(NOMS), rng.choice(PRENOMS), f"{kind}{n}@{domain}", f"{prefix}{n:08d}",
+               password_hash, role_id, created_at, created_at)
+
+
+def _status_weights():
+    """Poids cumulés des statuts pour chaque tranche d'âge"""
+    buckets = []
+    for b in range(AGE_BUCKETS):
+        age = b / (AGE_BUCKETS - 1)
+        total, cumulative = 0, []
+        for recent, old in zip(RECENT_WEIGHTS, OLD_WEIGHTS):
+            total += recent + (old - recent) * age
+            cumulative.append(total)
+        buckets.append(cumulative)
+    return buckets
+
+
+def _task_rows(count, user_ids, admin_ids, days, rng, now):
+    window = days * 86400
+    statuts = list(STATUTS)
+    weights = _status_weights()
+    random_, choices = rng.random, rng.choices
+    # Tirages par index : random.choice() coûte cher sur un million de lignes
+    titres, n_titres, n_users, n_admins = TITRES, len(TITRES), len(user_ids), len(admin_ids)
+    for n in range(count):
+        age = random_()
+        created_at = now - timedelta(seconds=age * window)
+        statut = choices(statuts, cum_weights=weights[int(age * (AGE_BUCKETS - 1))])[0]
+        if statut == "à faire":
+            updated_at = created_at
+        else:
+            updated_at = created_at + timedelta(seconds=random_() * age * window)
+        done = statut in ("terminé", "validé")
+        yield (
+            titres[int(random_() * n_titres)],
+            f"Tâche générée n°{n}",
+            statut,
+            "Terminé, à vérifier" if done and random_() < 0.3 else None,
+            statut == "validé",
+            updated_at if statut == "validé" else None,
+            created_at,
+            updated_at,
+            user_ids[int(random_() * n_users)],
+            admin_ids[int(random_() * n_admins)] if n_admins else None,
+        )
+
+
+def seed_data(users, tasks, admins=1, password=DEFAULT_PASSWORD, domain="seed.local", days=180,
+              seed=0, chunk_size=10000):
+    """Ajoute admins + users comptes et tasks tâches ; renvoie le nombre de lignes par table.
+
+    Les comptes sont admin<n>@domain et user<n>@domain, numérotés à la
+    suite des comptes déjà présents dans domain. Les tâches sont réparties
+    entre tous les utilisateurs (rôle "user") de domain. task_counters est
+    recalculée à la fin.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    roles = ensure_roles()
+    password_hash = password_hasher.hash(password)
+
+    def accounts(kind):
+        return select(User.id).where(User.role_id == roles[kind], User.email.like(f"%@{domain}"))
+
+    created = {}
+    for kind, count in (("admin", admins), ("user", users)):
+        start = db.session.scalar(select(func.count()).select_from(accounts(kind).subquery()))
+        created[f"{kind}s"] = _load(User.__table__, USER_COLUMNS, _user_rows(
+            start, count, roles[kind], kind, domain, password_hash, rng, now), chunk_size)
+
+    user_ids = db.session.scalars(accounts("user").order_by(User.id)).all()
+    admin_ids = db.session.scalars(accounts("admin").order_by(User.id)).all()
+    if tasks and not user_ids:
+        raise ValueError("Aucun utilisateur auquel assigner les tâches (users=0)")
+    defer = tasks >= DEFER_INDEXES_MIN
+    with _deferred_indexes(Task.__table__, defer), deferred_search_index(defer):
+        created["tasks"] = _load(Task.__table__, TASK_COLUMNS,
+                                 _task_rows(tasks, user_ids, admin_ids, days, rng, now), chunk_size)
+    db.session.commit()
+    rebuild_counters()
+    return created
@@ -0,0 +1,206 @@
+"""Journalisation structurée (JSON) écrite par un thread dédié.
+
+Les modules journalisent avec logging.getLogger(__name__) ; le logger
+racine ne porte qu'un QueueHandler : le thread de la requête se contente
+de mettre l'enregistrement en file, un QueueListener le formate et
+l'écrit sur stderr. File pleine (LOG_QUEUE_SIZE) : l'enregistrement est
+abandonné plutôt que de bloquer la requête.
+
+Chaque requête reçoit un identifiant (en-tête X-Request-ID du client ou
+du proxy s'il est valide, sinon généré) renvoyé dans la réponse et
+ajouté à tous les enregistrements émis pendant la requête. Les messages
+DEBUG (LOG_LEVEL=DEBUG, code de l'application seulement : les
+bibliothèques restent à INFO) ne sont gardés que pour une fraction
+LOG_DEBUG_SAMPLE_RATE des requêtes, tirée au début de la requête : une
+requête échantillonnée garde tous ses messages DEBUG.
+
+Les champs passés par extra={...} deviennent des clés du JSON.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+FORMATS = ("json", "text")
+
+# Loggers du code de l'application : seuls à descendre sous INFO
+APP_LOGGERS = ("app", "commands", "routes", "services", "utils")
+
+_REQUEST_ID = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+# Attributs propres à LogRecord : tout le reste vient de extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+logger = logging.getLogger(__name__)
+
+_listener = None
+_handler = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objet JSON par ligne"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Format lisible pour le développement, request_id et extra en fin de ligne"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = {key: value for key, value in vars(record).items()
+                  if key not in _RECORD_ATTRIBUTES and not key.startswith("_")}
+        if getattr(record, "request_id", None):
+            fields = {"request_id": record.request_id, **fields}
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class _RequestQueueHandler(QueueHandler):
+    """QueueHandler qui garde les champs structurés et n'attend jamais la file"""
+
+    def __init__(self, log_queue, sample_rate):
+        super().__init__(log_queue)
+        self.sample_rate = sample_rate
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno <= logging.DEBUG and not _debug_sampled(self.sample_rate):
+            return False
+        # Lu ici, dans le thread de la requête : g n'existe pas dans le thread d'écriture
+        if has_request_context():
+            record.request_id = g.get("request_id")
+        return super().filter(record)
+
+    def prepare(self, record):
+        # QueueHandler.prepare() réduit l'enregistrement à son texte formaté :
+        # on fige seulement le message et la trace, le formatage se fait dans le listener
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _debug_sampled(rate):
+    if rate >= 1:
+        return True
+    if has_request_context():
+        sampled = g.get("log_debug_sampled")
+        if sampled is not None:
+            return sampled
+    return random.random() < rate
+
+
+def configure(level="INFO", fmt="json", sample_rate=1.0, queue_size=10000, stream=None):
+    """(Ré)installe le QueueHandler sur le logger racine et démarre le thread d'écriture"""
+    global _listener, _handler
+    if fmt not in FORMATS:
+        raise ValueError(f"LOG_FORMAT inconnu : {fmt}")
+    numeric_level = logging.getLevelName(level.upper())
+    if not isinstance(numeric_level, int):
+        raise ValueError(f"LOG_LEVEL inconnu : {level}")
+    root = logging.getLogger()
+    # create_app() peut être appelé plusieurs fois (scripts, benchmarks)
+    if _listener is not None:
+        root.removeHandler(_handler)
+        _listener.stop()
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    log_queue = queue.Queue(maxsize=queue_size)
+    _handler = _RequestQueueHandler(log_queue, sample_rate)
+    _listener = QueueListener(log_queue, output)
+    _listener.start()
+    root.addHandler(_handler)
+    root.setLevel(max(numeric_level, logging.INFO))
+    for name in APP_LOGGERS:
+        logging.getLogger(name).setLevel(numeric_level)
+    # Journal interne du pool SQLAlchemy, nommé d'après la classe de services/db_pool.py
+    logging.getLogger("services.db_pool").setLevel(max(numeric_level, logging.INFO))
+
+
+def shutdown():
+    """Vide la file et arrête le thread d'écriture"""
+    global _listener
+    if _listener is not None:
+        logging.getLogger().removeHandler(_handler)
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown)
+
+
+def init_app(app):
+    configure(
+        level=app.config.get("LOG_LEVEL", "INFO"),
+        fmt=app.config.get("LOG_FORMAT", "json"),
+        sample_rate=app.config.get("LOG_DEBUG_SAMPLE_RATE", 1.0),
+        queue_size=app.config.get("LOG_QUEUE_SIZE", 10000),
+    )
+    # Tout passe par le logger racine : pas de second affichage par Flask
+    app.logger.removeHandler(default_handler)
+    sample_rate = app.config.get("LOG_DEBUG_SAMPLE_RATE", 1.0)
+    log_requests = app.config.get("LOG_REQUESTS", True)
+
+    @app.before_request
+    def _start_request():
+        incoming = request.headers.get("X-Request-ID", "")
+        g.request_id = incoming if _REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex
+        g.log_debug_sampled = sample_rate >= 1 or random.random() < sample_rate
+        g.log_start = time.perf_counter()
+
+    @app.after_request
+    def _log_request(response):
+        if "request_id" not in g:
+            return response
+        response.headers["X-Request-ID"] = g.request_id
+        # Sondes (Prometheus, Render) : appelées en continu, sans intérêt dans les journaux
+        if log_requests and request.endpoint not in ("metrics", "healthz"):
+            logger.info("%s %s %s", request.method, request.path, response.status_code, extra={
+                "method": request.method,
+                "path": request.path,
+                "endpoint": request.endpoint,
+                "status": response.status_code,
+                "duration_ms": round((time.perf_counter() - g.log_start) * 1000, 2),
+            })
+        return response
@@ -0,0 +1,134 @@
+"""Synchronisation incrémentale des listes de tâches (?since=<jeton>).
+
+Le jeton est un instant serveur opaque. Une requête avec ?since= renvoie
+les tâches dont updated_at est postérieur à ce jeton, les ids des tâches
+supprimées depuis (table task_tombstones) et un nouveau jeton. ?since=0
+fait une synchronisation complète qui fournit le premier jeton.
+
+Le nouveau jeton est reculé de SYNC_SAFETY_MARGIN secondes pour ne pas
+manquer une écriture encore en cours de commit : le client peut recevoir
+deux fois la même tâche, ce qui est sans effet (mise à jour par id).
+Ces lectures se font toujours sur le primaire : sur un réplica en retard
+de plus que cette marge, des modifications et suppressions seraient
+définitivement sautées, le jeton du client étant déjà passé après elles.
+Les tombstones plus vieux que SYNC_TOMBSTONE_RETENTION sont compactés au
+fil des suppressions (au plus une fois par SYNC_COMPACTION_INTERVAL) ou
+par `flask compact-tombstones` ; un jeton antérieur à cet horizon impose
+une resynchronisation complète.
+"""
+import base64
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import delete, insert, literal, select
+
+from extensions import db
+from models.task import Task
+from models.task_tombstone import TaskTombstone
+from services.replica import use_primary
+from services.task_queries import fetch_task_dicts, task_list_select
+
+_last_compaction = 0.0
+
+
+class InvalidSyncToken(ValueError):
+    """Jeton ?since= illisible"""
+
+
+class SyncTokenExpired(Exception):
+    """Jeton antérieur à la rétention des tombstones"""
+
+
+def encode_sync_token(moment):
+    return base64.urlsafe_b64encode(moment.isoformat().encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_sync_token(token):
+    """Instant UTC (naïf, comme les colonnes) encodé dans le jeton (None pour '0' : synchronisation complète)"""
+    if token == "0":
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        moment = datetime.fromisoformat(base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii"))
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidSyncToken("Jeton de synchronisation invalide")
+    if moment.tzinfo is not None:
+        # Jeton fabriqué avec un décalage : ramené en UTC naïf pour la comparaison avec updated_at
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _retention():
+    return timedelta(seconds=current_app.config.get("SYNC_TOMBSTONE_RETENTION", 30 * 86400))
+
+
+def changes_since(since, user_id=None, fields=None):
+    """Renvoie {"tasks", "deleted", "sync_token"} pour les tâches (de user_id) modifiées après since"""
+    started_at = datetime.utcnow()
+    if since is not None and since < started_at - _retention():
+        raise SyncTokenExpired()
+    use_primary()
+
+    criteria, tombstone_criteria = [], []
+    if user_id is not None:
+        criteria.append(Task.user_id == user_id)
+        tombstone_criteria.append(TaskTombstone.user_id == user_id)
+
+    deleted = []
+    if since is not None:
+        criteria.append(Task.updated_at > since)
+        deleted = list(db.session.scalars(
+            select(TaskTombstone.task_id)
+            .where(TaskTombstone.deleted_at > since, *tombstone_criteria)
+            .order_by(TaskTombstone.deleted_at, TaskTombstone.id)
+        ))
+
+    tasks = fetch_task_dicts(task_list_select(*criteria, fields=fields).order_by(Task.updated_at, Task.id), fields)
+    margin = timedelta(seconds=current_app.config.get("SYNC_SAFETY_MARGIN", 2))
+    return {
+        "tasks": tasks,
+        "deleted": list(dict.fromkeys(deleted)),
+        "sync_token": encode_sync_token(started_at - margin),
+    }
+
+
+def record_tombstones(tasks):
+    """Ajoute à la transaction courante les tombstones de tasks : [(task_id, user_id), ...]"""
+    if tasks:
+        now = datetime.utcnow()
+        db.session.execute(insert(TaskTombstone), [
+            {"task_id": task_id, "user_id": user_id, "deleted_at": now} for task_id, user_id in tasks
+        ])
+    _maybe_compact()
+
+
+def record_tombstones_matching(*criteria):
+    """Tombstones des tâches vérifiant criteria (INSERT ... SELECT, avant un DELETE ensembliste)"""
+    db.session.execute(insert(TaskTombstone).from_select(
+        ["task_id", "user_id", "deleted_at"],
+        select(Task.id, Task.user_id, literal(datetime.utcnow())).where(*criteria)
+    ))
+    _maybe_compact()
+
+
+def compact_tombstones():
+    """Supprime les tombstones plus vieux que la rétention ; renvoie le nombre supprimé"""
+    removed = _delete_expired()
+    db.session.commit()
+    return removed
+
+
+def _delete_expired():
+    # Dans la transaction de l'appelant : une seconde connexion attendrait son verrou (SQLite)
+    global _last_compaction
+    _last_compaction = time.monotonic()
+    result = db.session.execute(
+        delete(TaskTombstone).where(TaskTombstone.deleted_at < datetime.utcnow() - _retention())
+    )
+    return result.rowcount
+
+
+def _maybe_compact():
+    if time.monotonic() - _last_compaction > current_app.config.get("SYNC_COMPACTION_INTERVAL", 3600):
+        _delete_expired()
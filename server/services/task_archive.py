@@ -0,0 +1,142 @@
+"""Archivage des tâches validées anciennes (table tasks_archive).
+
+Une tâche validée n'est plus modifiée mais pèse sur tous les index et
+toutes les listes de tasks. archive_tasks() déplace les tâches validées
+depuis plus de ARCHIVE_AFTER_DAYS jours vers tasks_archive, par lots de
+ARCHIVE_BATCH_SIZE (une transaction courte par lot) :
+INSERT ... SELECT dans l'archive, tombstones (les clients ?since= retirent
+la tâche), événement task.archived, compteurs de task_counters, puis
+DELETE dans tasks. Les tâches archivées gardent leur id.
+
+SQLite (sans AUTOINCREMENT) et MySQL avant 8.0 (compteur recalculé au
+redémarrage) peuvent réattribuer l'id d'une tâche archivée à une tâche
+créée plus tard, dès que les ids supérieurs ont quitté tasks. Une tâche
+dont l'id est déjà dans tasks_archive n'est donc jamais prise dans un lot
+(le lot n'échoue pas sur la clé primaire de l'archive) : elle reste dans
+tasks et id_conflicts() la signale (voir `flask archive-tasks`).
+
+Les listes et statistiques courantes ne lisent que tasks ; l'archive
+n'est lue que par les routes .../tasks/archive (list_archived_tasks).
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, exists, func, insert, literal, select
+
+from extensions import db
+from models.task import Task
+from models.task_archive import TaskArchive
+from services.events import TASK_ARCHIVED, publish_matching
+from services.sync import record_tombstones_matching
+from services.task_queries import TASK_COLUMNS, USER_COLUMNS, AssignedUser, task_row_to_dict
+from services.task_stats import adjust_counters, counters_enabled, deltas_matching
+from utils.pagination import encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Tri des listes de l'archive (curseur propre à ce tri)
+ARCHIVE_SORT = "-date_validation"
+
+# Colonnes recopiées de tasks (toutes sauf archived_at)
+_COPIED = [column.key for column in TaskArchive.__table__.columns if column.key != "archived_at"]
+
+ARCHIVE_COLUMNS = tuple(TaskArchive.__table__.c[column.key] for column in TASK_COLUMNS) + (TaskArchive.archived_at,)
+
+
+def archivable(before):
+    """Critères des tâches à archiver : validées avant before"""
+    return Task.statut == 'validé', Task.date_validation < before
+
+
+def _id_archived():
+    return exists().where(TaskArchive.id == Task.id)
+
+
+def id_conflicts(limit=20):
+    """(nombre, premiers ids) des tâches dont l'id est déjà pris dans tasks_archive (id réattribué)"""
+    count = db.session.scalar(select(func.count(Task.id)).where(_id_archived()))
+    if not count:
+        return 0, []
+    return count, db.session.scalars(select(Task.id).where(_id_archived()).order_by(Task.id).limit(limit)).all()
+
+
+def count_archivable(before):
+    return db.session.scalar(select(func.count(Task.id)).where(*archivable(before), ~_id_archived()))
+
+
+def _next_batch(before, batch_size, max_id):
+    # Verrou des lignes du lot (PostgreSQL, MySQL) : une modification concurrente attend le
+    # commit ; les lignes déjà verrouillées par un autre archivage sont sautées
+    return db.session.scalars(
+        select(Task.id).where(*archivable(before), ~_id_archived(), Task.id < max_id)
+        .order_by(Task.date_validation, Task.id).limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+
+def archive_batch(ids, before):
+    """Déplace les tâches ids (toujours archivables) dans tasks_archive ; renvoie le nombre déplacé"""
+    criteria = (Task.id.in_(ids), *archivable(before))
+    if counters_enabled():
+        adjust_counters(deltas_matching(*criteria))
+    publish_matching(TASK_ARCHIVED, *criteria)
+    db.session.execute(insert(TaskArchive).from_select(
+        _COPIED + ["archived_at"],
+        select(*(Task.__table__.c[key] for key in _COPIED), literal(datetime.utcnow())).where(*criteria)
+    ))
+    record_tombstones_matching(*criteria)
+    result = db.session.execute(delete(Task).where(*criteria).execution_options(synchronize_session=False))
+    db.session.commit()
+    return result.rowcount
+
+
+def archive_tasks(older_than_days, batch_size=1000, max_batches=None, pause=0.0):
+    """Archive les tâches validées depuis plus de older_than_days jours ; renvoie (tâches, lots)"""
+    before = datetime.utcnow() - timedelta(days=older_than_days)
+    # La tâche d'id maximal reste dans tasks : tant qu'elle y est, SQLite ne réattribue pas les ids
+    # archivés (réduit les conflits sans les empêcher, voir id_conflicts())
+    max_id = db.session.scalar(select(func.max(Task.id)))
+    total = batches = 0
+    while max_id is not None and (max_batches is None or batches < max_batches):
+        ids = _next_batch(before, batch_size, max_id)
+        if not ids:
+            db.session.rollback()
+            break
+        moved = archive_batch(ids, before)
+        total += moved
+        batches += 1
+        logger.info("Lot de tâches archivé", extra={"archived": moved, "batch": batches})
+        if pause:
+            time.sleep(pause)
+    return total, batches
+
+
+def archive_list_select(*criteria):
+    """SELECT projeté tâches archivées + utilisateur assigné (colonnes de task_list_select())"""
+    return (select(*ARCHIVE_COLUMNS, *USER_COLUMNS).select_from(TaskArchive)
+            .outerjoin(AssignedUser, AssignedUser.id == TaskArchive.user_id)
+            .where(*criteria))
+
+
+def list_archived_tasks(criteria, limit, position=None):
+    """Page de tâches archivées, plus récemment validées d'abord ; renvoie (tâches, next_cursor)"""
+    stmt = archive_list_select(*criteria)
+    if position is not None:
+        validated, task_id = position
+        stmt = stmt.where((TaskArchive.date_validation < validated)
+                          | ((TaskArchive.date_validation == validated) & (TaskArchive.id < task_id)))
+    rows = db.session.execute(
+        stmt.order_by(TaskArchive.date_validation.desc(), TaskArchive.id.desc()).limit(limit + 1)
+    ).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["date_validation"], rows[-1]["id"], ARCHIVE_SORT)
+    tasks = []
+    for row in rows:
+        task = task_row_to_dict(row)
+        task["archived_at"] = row["archived_at"]
+        tasks.append(task)
+    return tasks, next_cursor
@@ -0,0 +1,279 @@
+"""Opérations sur des lots de tâches, en requêtes ensemblistes.
+
+Chaque opération valide tout le lot avec une seule requête, écrit avec
+un seul INSERT (executemany) ou UPDATE/DELETE ... WHERE id IN (...) dans
+une seule transaction, et renvoie un résultat par élément.
+"""
+from datetime import datetime
+
+from sqlalchemy import delete, insert, select, update
+
+from extensions import db
+from models.role import Role
+from models.task import STATUTS, TRANSITIONS_UTILISATEUR, Task
+from models.user import User
+from services.events import (
+    TASK_CREATED, TASK_DELETED, TASK_UPDATED, TASK_VALIDATED, publish_matching, publish_tasks
+)
+from services.sync import record_tombstones, record_tombstones_matching
+from services.task_queries import fetch_task_dicts, task_list_select
+from services.task_stats import adjust_counters, counters_enabled, deltas_matching, transition_deltas
+
+MAX_BULK_ITEMS = 500
+
+
+class BulkRequestError(ValueError):
+    """Corps de requête de lot invalide (erreur globale, pas par élément)"""
+
+
+def parse_bulk_create(data):
+    """Normalise le corps de POST /admin/tasks/bulk en liste d'éléments.
+
+    Deux formes acceptées :
+    - {"tasks": [{"user_id", "titre", "description"}, ...]}
+    - {"user_ids": [...], "titre": ..., "description": ...} (une tâche par utilisateur)
+    """
+    if not isinstance(data, dict):
+        raise BulkRequestError("Corps JSON attendu")
+
+    if "tasks" in data:
+        items = data["tasks"]
+        if not isinstance(items, list):
+            raise BulkRequestError("'tasks' doit être une liste")
+    elif "user_ids" in data:
+        user_ids = data["user_ids"]
+        if not isinstance(user_ids, list):
+            raise BulkRequestError("'user_ids' doit être une liste")
+        items = [
+            {"user_id": user_id, "titre": data.get("titre"), "description": data.get("description", "")}
+            for user_id in user_ids
+        ]
+    else:
+        raise BulkRequestError("Fournir 'tasks' ou 'user_ids'")
+
+    if not items:
+        raise BulkRequestError("Le lot est vide")
+    if len(items) > MAX_BULK_ITEMS:
+        raise BulkRequestError(f"{MAX_BULK_ITEMS} éléments maximum par lot")
+    return items
+
+
+def standard_user_ids(user_ids):
+    """Parmi user_ids, ceux qui désignent un utilisateur standard (une requête)"""
+    if not user_ids:
+        return set()
+    stmt = (
+        select(User.id)
+        .join(Role, Role.id == User.role_id)
+        .where(User.id.in_(user_ids), Role.nom == 'user')
+    )
+    return set(db.session.scalars(stmt))
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def create_tasks(items, assigned_by_id):
+    """Crée les tâches valides du lot ; renvoie (nombre créé, résultats par élément)"""
+    results = [None] * len(items)
+    candidates = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {"index": index, "status": "error", "error": "Élément invalide"}
+            continue
+        user_id = _as_int(item.get("user_id"))
+        titre = item.get("titre")
+        description = item.get("description", "")
+        if not (user_id and isinstance(titre, str) and titre):
+            results[index] = {"index": index, "status": "error",
+                              "error": "L'utilisateur et le titre sont obligatoires"}
+            continue
+        if description is not None and not isinstance(description, str):
+            results[index] = {"index": index, "status": "error", "error": "Description invalide"}
+            continue
+        candidates[index] = {
+            "titre": titre,
+            "description": description,
+            "user_id": user_id,
+            "assigned_by_id": assigned_by_id,
+            "statut": 'à faire',
+        }
+
+    valid_users = standard_user_ids({row["user_id"] for row in candidates.values()})
+    rows = []
+    for index, row in candidates.items():
+        if row["user_id"] in valid_users:
+            rows.append((index, row))
+        else:
+            results[index] = {"index": index, "status": "error",
+                              "error": "Utilisateur invalide. Doit être un utilisateur standard (non-admin)"}
+
+    if rows:
+        task_ids = _insert_tasks([row for _, row in rows])
+        # Correspondance élément -> tâche créée par contenu : deux éléments
+        # identiques sont interchangeables, l'ordre de RETURNING importe peu
+        created = {}
+        for task in fetch_task_dicts(task_list_select(Task.id.in_(task_ids)).order_by(Task.id)):
+            created.setdefault(_task_key(task), []).append(task)
+        for index, row in rows:
+            task = created[_task_key(row)].pop(0)
+            results[index] = {"index": index, "status": "created", "task": task}
+        publish_tasks(TASK_CREATED, [(result["task"]["id"], result["task"]["user_id"], {"statut": 'à faire'})
+                                     for result in results if result["status"] == "created"])
+        db.session.commit()
+
+    return len(rows), results
+
+
+def _task_key(task):
+    return task["user_id"], task["titre"], task["description"]
+
+
+def _insert_tasks(rows):
+    """INSERT du lot dans la transaction courante ; renvoie les ids créés"""
+    if db.engine.dialect.insert_executemany_returning:
+        # Un seul executemany, ids récupérés par RETURNING (PostgreSQL, SQLite >= 3.35)
+        task_ids = list(db.session.scalars(insert(Task).returning(Task.id), rows))
+        adjust_counters(transition_deltas((None, (row["user_id"], row["statut"])) for row in rows))
+        return task_ids
+
+    # Sans RETURNING en executemany (MySQL) : l'ORM insère ligne par ligne,
+    # toujours dans une seule transaction, pour connaître chaque id
+    tasks = [Task(**row) for row in rows]
+    db.session.add_all(tasks)
+    db.session.flush()
+    return [task.id for task in tasks]
+
+
+def parse_task_ids(data):
+    """Liste d'ids (sans doublons, ordre conservé) depuis {"ids": [...]}"""
+    ids = data.get("ids") if isinstance(data, dict) else None
+    if not isinstance(ids, list) or not ids:
+        raise BulkRequestError("'ids' doit être une liste non vide")
+    if len(ids) > MAX_BULK_ITEMS:
+        raise BulkRequestError(f"{MAX_BULK_ITEMS} éléments maximum par lot")
+    parsed = [_as_int(task_id) for task_id in ids]
+    if None in parsed:
+        raise BulkRequestError("'ids' doit contenir des entiers")
+    return list(dict.fromkeys(parsed))
+
+
+def _bulk_transition(ids, allowed_from, values, event_type, *scope):
+    """Applique values aux tâches de ids dont le statut est dans allowed_from.
+
+    Une requête lit les statuts actuels (pour expliquer les refus), puis un
+    seul UPDATE ... WHERE id IN (...) AND statut IN (...) écrit le lot ; la
+    condition sur le statut est répétée dans l'UPDATE pour rester correcte
+    si une tâche change entre les deux requêtes.
+    """
+    rows = db.session.execute(
+        select(Task.id, Task.statut, Task.user_id).where(Task.id.in_(ids), *scope)
+    ).all()
+    current = {task_id: statut for task_id, statut, _ in rows}
+    owners = {task_id: user_id for task_id, _, user_id in rows}
+
+    skipped, eligible = [], []
+    for task_id in ids:
+        if task_id not in current:
+            skipped.append({"id": task_id, "error": "Tâche non trouvée"})
+        elif current[task_id] not in allowed_from:
+            skipped.append({"id": task_id, "error": "Transition non autorisée",
+                            "statut_actuel": current[task_id]})
+        else:
+            eligible.append(task_id)
+
+    updated = eligible
+    if eligible:
+        result = db.session.execute(
+            update(Task)
+            .where(Task.id.in_(eligible), Task.statut.in_(allowed_from), *scope)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != len(eligible):
+            # Course avec une autre requête : on relit ce qui a réellement changé
+            now = dict(db.session.execute(
+                select(Task.id, Task.statut).where(Task.id.in_(eligible))
+            ).all())
+            updated = [task_id for task_id in eligible if now.get(task_id) == values["statut"]]
+            skipped += [{"id": task_id, "error": "Transition non autorisée", "statut_actuel": now.get(task_id)}
+                        for task_id in eligible if task_id not in updated]
+        adjust_counters(transition_deltas(
+            ((owners[task_id], current[task_id]), (owners[task_id], values["statut"])) for task_id in updated
+        ))
+        publish_tasks(event_type, [(task_id, owners[task_id], {"statut": values["statut"]}) for task_id in updated])
+        db.session.commit()
+
+    return updated, skipped
+
+
+def validate_tasks(ids):
+    """Valide (admin) les tâches 'terminé' du lot"""
+    return _bulk_transition(ids, ('terminé',), {
+        "statut": 'validé',
+        "valide_par_admin": True,
+        "date_validation": datetime.utcnow(),
+    }, TASK_VALIDATED)
+
+
+def update_user_tasks_status(ids, user_id, new_status):
+    """Change le statut des tâches du lot appartenant à user_id (mêmes règles qu'une par une)"""
+    return _bulk_transition(ids, TRANSITIONS_UTILISATEUR[new_status], {"statut": new_status},
+                            TASK_UPDATED, Task.user_id == user_id)
+
+
+def parse_delete_filter(data):
+    """Critères SQL depuis {"filter": {"statut": ..., "user_id": ...}} (au moins un critère)"""
+    filters = data.get("filter") if isinstance(data, dict) else None
+    if not isinstance(filters, dict) or not filters:
+        raise BulkRequestError("Fournir 'ids' ou un 'filter' non vide")
+
+    criteria = []
+    unknown = set(filters) - {"statut", "user_id"}
+    if unknown:
+        raise BulkRequestError(f"Critères non supportés : {', '.join(sorted(unknown))}")
+    if "statut" in filters:
+        statuts = filters["statut"] if isinstance(filters["statut"], list) else [filters["statut"]]
+        if not statuts or any(statut not in STATUTS for statut in statuts):
+            raise BulkRequestError("Statut invalide")
+        criteria.append(Task.statut.in_(statuts))
+    if "user_id" in filters:
+        user_id = _as_int(filters["user_id"])
+        if user_id is None:
+            raise BulkRequestError("user_id doit être un entier")
+        criteria.append(Task.user_id == user_id)
+    return criteria
+
+
+def delete_tasks(ids):
+    """Supprime les tâches du lot ; renvoie (ids supprimés, ignorés)"""
+    rows = db.session.execute(select(Task.id, Task.user_id, Task.statut).where(Task.id.in_(ids))).all()
+    existing = {task_id: user_id for task_id, user_id, _ in rows}
+    skipped = [{"id": task_id, "error": "Tâche non trouvée"} for task_id in ids if task_id not in existing]
+    deleted = [task_id for task_id in ids if task_id in existing]
+    if deleted:
+        adjust_counters(transition_deltas(((user_id, statut), None) for _, user_id, statut in rows))
+        publish_tasks(TASK_DELETED, [(task_id, existing[task_id], {}) for task_id in deleted])
+        record_tombstones([(task_id, existing[task_id]) for task_id in deleted])
+        db.session.execute(
+            delete(Task).where(Task.id.in_(deleted)).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    return deleted, skipped
+
+
+def delete_tasks_matching(criteria):
+    """Supprime toutes les tâches qui vérifient criteria (un seul DELETE) ; renvoie le nombre"""
+    if counters_enabled():
+        adjust_counters(deltas_matching(*criteria))
+    publish_matching(TASK_DELETED, *criteria)
+    record_tombstones_matching(*criteria)
+    result = db.session.execute(
+        delete(Task).where(*criteria).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
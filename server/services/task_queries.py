@@ -0,0 +1,113 @@
+"""Requêtes de lecture des tâches, sans N+1.
+
+Les listes ne chargent pas d'objets Task : on sélectionne uniquement les
+colonnes utiles au JSON, l'utilisateur assigné est récupéré par jointure
+dans la même requête, et chaque ligne est transformée directement en dict
+(même format que Task.to_dict()).
+
+Avec ?fields=, seules les colonnes demandées sont lues (plus id et
+created_at, nécessaires à la pagination) : description et
+note_utilisateur, en TEXT, ne sont pas lues si le client ne les veut pas.
+La jointure sur l'utilisateur n'est faite que si le champ "user" est demandé.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from extensions import db
+from models.task import Task
+from models.user import User
+
+AssignedUser = aliased(User, name="assigned_user")
+
+TASK_COLUMNS = (
+    Task.id,
+    Task.titre,
+    Task.description,
+    Task.statut,
+    Task.note_utilisateur,
+    Task.valide_par_admin,
+    Task.date_validation,
+    Task.created_at,
+    Task.updated_at,
+    Task.user_id,
+    Task.assigned_by_id,
+)
+
+USER_COLUMNS = (
+    AssignedUser.id.label("user__id"),
+    AssignedUser.nom.label("user__nom"),
+    AssignedUser.prenom.label("user__prenom"),
+    AssignedUser.email.label("user__email"),
+)
+
+# Champs acceptés par ?fields= ("user" : objet imbriqué de l'utilisateur assigné)
+TASK_FIELDS = tuple(column.key for column in TASK_COLUMNS) + ("user",)
+
+# Toujours lues : position du curseur de pagination
+_KEY_COLUMNS = ("id", "created_at")
+
+
+def task_list_select(*criteria, fields=None):
+    """SELECT projeté tâches + utilisateur assigné (une seule requête)"""
+    columns = TASK_COLUMNS
+    if fields is not None:
+        columns = [column for column in TASK_COLUMNS if column.key in fields or column.key in _KEY_COLUMNS]
+    stmt = select(*columns).select_from(Task)
+    if fields is None or "user" in fields:
+        stmt = stmt.add_columns(*USER_COLUMNS).outerjoin(AssignedUser, AssignedUser.id == Task.user_id)
+    if criteria:
+        stmt = stmt.where(*criteria)
+    return stmt
+
+
+def task_row_to_dict(row, fields=None):
+    """Construit le dict d'une tâche depuis une ligne de task_list_select()
+
+    Les dates restent des datetime : l'encodeur JSON (utils/json_provider.py)
+    les écrit en ISO 8601.
+    """
+    if fields is not None:
+        data = {field: row[field] for field in fields if field != 'user'}
+        if 'user' in fields:
+            data['user'] = _assigned_user(row)
+        return data
+    return {
+        'id': row['id'],
+        'titre': row['titre'],
+        'description': row['description'],
+        'statut': row['statut'],
+        'note_utilisateur': row['note_utilisateur'],
+        'valide_par_admin': row['valide_par_admin'],
+        'date_validation': row['date_validation'],
+        'created_at': row['created_at'],
+        'updated_at': row['updated_at'],
+        'user_id': row['user_id'],
+        'assigned_by_id': row['assigned_by_id'],
+        'user': _assigned_user(row)
+    }
+
+
+def _assigned_user(row):
+    if row['user__id'] is None:
+        return None
+    return {
+        'id': row['user__id'],
+        'nom': row['user__nom'],
+        'prenom': row['user__prenom'],
+        'email': row['user__email']
+    }
+
+
+def fetch_task_dicts(stmt, fields=None):
+    """Exécute un SELECT de task_list_select() et renvoie la liste de dicts"""
+    return [task_row_to_dict(row, fields) for row in db.session.execute(stmt).mappings()]
+
+
+def compact_tasks(tasks):
+    """Retire l'objet "user" de chaque tâche ; renvoie la table {id: user} dédoublonnée"""
+    users = {}
+    for task in tasks:
+        user = task.pop('user', None)
+        if user is not None:
+            users.setdefault(str(user['id']), user)
+    return users
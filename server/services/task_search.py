@@ -0,0 +1,239 @@
+"""Recherche plein texte dans les tâches (titre, description, note_utilisateur).
+
+L'index est tenu à jour par la base elle-même, quelle que soit la route
+d'écriture (ORM, INSERT ensemblistes de task_bulk, flask seed) :
+
+- PostgreSQL : colonne générée tasks.search_vector (tsvector, titre pondéré
+  plus que la description puis la note) et index GIN ; classement ts_rank_cd ;
+- SQLite : table FTS5 tasks_fts (contenu externe : tasks) alimentée par
+  trigger ; classement bm25 ;
+- MySQL : index FULLTEXT, MATCH ... AGAINST en mode booléen ; les mots que
+  InnoDB n'indexe pas (plus courts que SEARCH_MYSQL_MIN_TOKEN_SIZE, mots
+  vides) sont retirés, et sans mot indexable restant la recherche passe
+  par LIKE ;
+- autre dialecte : LIKE sur chaque mot, sans index ni classement.
+
+Ces objets sont créés par la migration f2a4c6e8b0d1 et, pour
+db.create_all(), par les DDL attachés ci-dessous à la table tasks. Ils
+ne sont pas déclarés dans les modèles : migrations/env.py les ignore
+(is_search_object()) pour que `flask db migrate` ne les supprime pas.
+
+Les résultats sont triés par pertinence puis par id décroissant. Le
+classement impose d'évaluer toutes les correspondances : la pagination
+se fait donc par décalage (curseur opaque), limité à MAX_OFFSET.
+"""
+import base64
+import json
+import re
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy import DDL, column, desc, event, func, literal, literal_column, table
+
+from extensions import db
+from models.task import Task
+from services.task_queries import task_list_select, task_row_to_dict
+from utils.pagination import MAX_LIMIT
+
+# Configuration de recherche PostgreSQL (racinisation, mots vides)
+SEARCH_CONFIG = "french"
+
+DEFAULT_LIMIT = 20
+# Au-delà, affiner la recherche plutôt que paginer
+MAX_OFFSET = 1000
+MAX_QUERY_LENGTH = 200
+
+_WORD = re.compile(r"\w+")
+
+# Liste de mots vides par défaut d'InnoDB (INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD)
+MYSQL_STOPWORDS = frozenset((
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for", "from", "how", "i",
+    "in", "is", "it", "la", "of", "on", "or", "that", "the", "this", "to", "was", "what", "when",
+    "where", "who", "will", "with", "und", "www",
+))
+
+SQLITE_INSERT_TRIGGER = (
+    "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, titre, description, note_utilisateur) "
+    "VALUES (new.id, new.titre, new.description, new.note_utilisateur); END"
+)
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5(titre, description, note_utilisateur, "
+    "content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    SQLITE_INSERT_TRIGGER,
+    "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, titre, description, note_utilisateur) "
+    "VALUES ('delete', old.id, old.titre, old.description, old.note_utilisateur); END",
+    # Seuls les changements de texte touchent l'index (pas les changements de statut)
+    "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF titre, description, note_utilisateur ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, titre, description, note_utilisateur) "
+    "VALUES ('delete', old.id, old.titre, old.description, old.note_utilisateur); "
+    "INSERT INTO tasks_fts(rowid, titre, description, note_utilisateur) "
+    "VALUES (new.id, new.titre, new.description, new.note_utilisateur); END",
+)
+
+POSTGRESQL_GIN_INDEX = "CREATE INDEX ix_tasks_search_vector ON tasks USING GIN (search_vector)"
+POSTGRESQL_DDL = (
+    "ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(titre, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(note_utilisateur, '')), 'C')) STORED",
+    POSTGRESQL_GIN_INDEX,
+)
+
+MYSQL_DDL = (
+    "CREATE FULLTEXT INDEX ix_tasks_fulltext ON tasks (titre, description, note_utilisateur)",
+)
+
+# Objets plein texte hors des modèles : tables FTS5 (et tables internes tasks_fts_*),
+# colonne et index PostgreSQL, index FULLTEXT MySQL
+SEARCH_TABLE_PREFIX = "tasks_fts"
+SEARCH_COLUMNS = {"search_vector"}
+SEARCH_INDEXES = {"ix_tasks_search_vector", "ix_tasks_fulltext"}
+
+
+def is_search_object(name, type_):
+    """Vrai pour un objet plein texte créé par DDL (à ignorer par l'autogénération Alembic)"""
+    if type_ == "table":
+        return bool(name) and name.startswith(SEARCH_TABLE_PREFIX)
+    if type_ == "column":
+        return name in SEARCH_COLUMNS
+    if type_ == "index":
+        return name in SEARCH_INDEXES
+    return False
+
+
+for _dialect, _statements in (("sqlite", SQLITE_DDL), ("postgresql", POSTGRESQL_DDL), ("mysql", MYSQL_DDL)):
+    for _statement in _statements:
+        event.listen(Task.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+# Les triggers disparaissent avec tasks, pas la table FTS5
+event.listen(Task.__table__, "after_drop", DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"))
+
+
+@contextmanager
+def deferred_search_index(enabled=True):
+    """Suspend l'indexation des nouvelles tâches le temps d'un chargement massif, puis reconstruit l'index"""
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    if enabled and dialect == "sqlite" and connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'tasks_fts_ai'").first():
+        connection.exec_driver_sql("DROP TRIGGER tasks_fts_ai")
+        yield
+        connection.exec_driver_sql(SQLITE_INSERT_TRIGGER)
+        connection.exec_driver_sql("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+    elif enabled and dialect == "postgresql" and connection.exec_driver_sql(
+            "SELECT to_regclass('ix_tasks_search_vector')").scalar() is not None:
+        connection.exec_driver_sql("DROP INDEX ix_tasks_search_vector")
+        yield
+        connection.exec_driver_sql(POSTGRESQL_GIN_INDEX)
+    else:
+        yield
+
+
+class InvalidSearch(ValueError):
+    """Paramètres q/limit/cursor invalides"""
+
+
+def _encode_offset(offset):
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_offset(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["offset"])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidSearch("Curseur invalide")
+    if not 0 <= offset <= MAX_OFFSET:
+        raise InvalidSearch("Curseur invalide")
+    return offset
+
+
+def parse_search_args(args):
+    """Lit q/limit/cursor ; renvoie (mots, limit, offset)"""
+    q = (args.get("q") or "").strip()
+    if not q:
+        raise InvalidSearch("Le paramètre q est requis")
+    if len(q) > MAX_QUERY_LENGTH:
+        raise InvalidSearch(f"q ne doit pas dépasser {MAX_QUERY_LENGTH} caractères")
+    terms = _WORD.findall(q)
+    if not terms:
+        raise InvalidSearch("q doit contenir au moins un mot")
+
+    limit = args.get("limit", DEFAULT_LIMIT)
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise InvalidSearch("limit doit être un entier")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise InvalidSearch(f"limit doit être compris entre 1 et {MAX_LIMIT}")
+
+    cursor = args.get("cursor")
+    return terms, limit, _decode_offset(cursor) if cursor else 0
+
+
+def _match_postgresql(stmt, terms):
+    vector = literal_column("tasks.search_vector")
+    query = func.plainto_tsquery(SEARCH_CONFIG, " ".join(terms))
+    return stmt.where(vector.op("@@")(query)), func.ts_rank_cd(vector, query)
+
+
+def _match_sqlite(stmt, terms):
+    fts = table("tasks_fts", column("rowid"))
+    # Chaque mot entre guillemets : pas d'opérateur FTS5 venant du client ; mots implicitement liés par AND
+    query = " ".join(f'"{term}"' for term in terms)
+    stmt = stmt.join(fts, fts.c.rowid == Task.id).where(literal_column("tasks_fts").op("MATCH")(query))
+    # bm25 : plus petit = plus pertinent ; poids titre > description > note
+    return stmt, -func.bm25(literal_column("tasks_fts"), 10.0, 5.0, 2.0)
+
+
+def _match_mysql(stmt, terms):
+    # Import différé : le dialecte MySQL n'est chargé que s'il sert
+    from sqlalchemy.dialects.mysql import match
+
+    # Un mot non indexé requis par "+" ne correspondrait jamais : il est ignoré, comme par
+    # plainto_tsquery (PostgreSQL) pour les mots vides
+    min_size = current_app.config.get("SEARCH_MYSQL_MIN_TOKEN_SIZE", 3)
+    indexed = [term for term in terms if len(term) >= min_size and term.lower() not in MYSQL_STOPWORDS]
+    if not indexed:
+        return _match_like(stmt, terms)
+    # "+mot" : tous les mots requis, comme pour les autres dialectes
+    relevance = match(Task.titre, Task.description, Task.note_utilisateur,
+                      against=" ".join(f"+{term}" for term in indexed)).in_boolean_mode()
+    return stmt.where(relevance), relevance
+
+
+def _match_like(stmt, terms):
+    for term in terms:
+        stmt = stmt.where(Task.titre.icontains(term, autoescape=True)
+                          | Task.description.icontains(term, autoescape=True)
+                          | Task.note_utilisateur.icontains(term, autoescape=True))
+    return stmt, literal(0.0)
+
+
+BACKENDS = {
+    "postgresql": _match_postgresql,
+    "sqlite": _match_sqlite,
+    "mysql": _match_mysql,
+}
+
+
+def search_tasks(terms, limit, offset=0, criteria=(), fields=None):
+    """Tâches vérifiant criteria et contenant tous les mots, triées par pertinence ; renvoie (tâches, next_cursor)"""
+    backend = BACKENDS.get(db.engine.dialect.name, _match_like)
+    stmt, score = backend(task_list_select(*criteria, fields=fields), terms)
+    stmt = (stmt.add_columns(score.label("score"))
+            .order_by(desc("score"), Task.id.desc())
+            .limit(limit + 1).offset(offset))
+
+    tasks = []
+    rows = db.session.execute(stmt).mappings().all()
+    for row in rows[:limit]:
+        task = task_row_to_dict(row, fields)
+        task["score"] = float(row["score"])
+        tasks.append(task)
+
+    next_cursor = None
+    if len(rows) > limit and offset + limit <= MAX_OFFSET:
+        next_cursor = _encode_offset(offset + limit)
+    return tasks, next_cursor
@@ -0,0 +1,165 @@
+"""Statistiques du tableau de bord admin.
+
+Deux sources pour le même résultat :
+- "live" : un GROUP BY user_id, statut sur tasks (index ix_tasks_user_id_statut) ;
+- "counters" : la table task_counters, tenue à jour dans la transaction de
+  chaque écriture quand TASK_COUNTERS_ENABLED est actif. La lecture ne
+  dépend alors que du nombre d'utilisateurs.
+
+Les écritures ORM (une tâche à la fois) sont comptées par un listener
+before_flush ; les écritures ensemblistes de services/task_bulk.py passent
+leurs variations à adjust_counters(). Après activation, ou en cas de
+doute, rebuild_counters() recalcule la table depuis tasks.
+"""
+import importlib
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import delete, event, func, inspect, insert, select
+
+from extensions import db
+from models.task import STATUTS, Task
+from models.task_counter import TaskCounter
+from models.user import User
+
+# Modules des INSERT ... ON CONFLICT / ON DUPLICATE KEY, importés au premier upsert :
+# seul le dialecte de la base est chargé au démarrage (par le moteur)
+_UPSERTS = {
+    "mysql": "sqlalchemy.dialects.mysql",
+    "mariadb": "sqlalchemy.dialects.mysql",
+    "postgresql": "sqlalchemy.dialects.postgresql",
+    "sqlite": "sqlalchemy.dialects.sqlite",
+}
+
+
+def counters_enabled():
+    return current_app.config.get("TASK_COUNTERS_ENABLED", False)
+
+
+def live_counts():
+    return db.session.execute(
+        select(Task.user_id, Task.statut, func.count()).group_by(Task.user_id, Task.statut)
+    ).all()
+
+
+def counter_counts():
+    return db.session.execute(
+        select(TaskCounter.user_id, TaskCounter.statut, TaskCounter.total).where(TaskCounter.total != 0)
+    ).all()
+
+
+def dashboard_stats(source=None):
+    """Compteurs par statut, par utilisateur et validées / en attente de validation"""
+    source = source or ("counters" if counters_enabled() else "live")
+    rows = counter_counts() if source == "counters" else live_counts()
+
+    par_statut = dict.fromkeys(STATUTS, 0)
+    par_utilisateur = {}
+    for user_id, statut, total in rows:
+        par_statut[statut] = par_statut.get(statut, 0) + total
+        entry = par_utilisateur.setdefault(user_id, {"total": 0, "par_statut": dict.fromkeys(STATUTS, 0)})
+        entry["total"] += total
+        entry["par_statut"][statut] = entry["par_statut"].get(statut, 0) + total
+
+    names = {}
+    if par_utilisateur:
+        names = {row.id: row for row in db.session.execute(
+            select(User.id, User.nom, User.prenom).where(User.id.in_(par_utilisateur))
+        )}
+
+    return {
+        "total": sum(par_statut.values()),
+        "par_statut": par_statut,
+        "validees": par_statut.get('validé', 0),
+        "en_attente_validation": par_statut.get('terminé', 0),
+        "par_utilisateur": [
+            {
+                "user_id": user_id,
+                "nom": names[user_id].nom if user_id in names else None,
+                "prenom": names[user_id].prenom if user_id in names else None,
+                **entry,
+            }
+            for user_id, entry in sorted(par_utilisateur.items())
+        ],
+        "source": source,
+    }
+
+
+def adjust_counters(deltas, connection=None):
+    """Applique {(user_id, statut): variation} à task_counters (un seul upsert en executemany)"""
+    if not counters_enabled():
+        return
+    rows = [{"user_id": user_id, "statut": statut, "total": delta}
+            for (user_id, statut), delta in deltas.items() if delta]
+    if not rows:
+        return
+    connection = connection or db.session.connection()
+    stmt = importlib.import_module(_UPSERTS[connection.dialect.name]).insert(TaskCounter)
+    if connection.dialect.name in ("mysql", "mariadb"):
+        stmt = stmt.on_duplicate_key_update(total=TaskCounter.total + stmt.inserted.total)
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TaskCounter.user_id, TaskCounter.statut],
+            set_={"total": TaskCounter.total + stmt.excluded.total},
+        )
+    connection.execute(stmt, rows)
+
+
+def transition_deltas(changes):
+    """Variations pour des tâches qui passent de (user_id, ancien statut) à (user_id, nouveau statut)"""
+    deltas = Counter()
+    for before, after in changes:
+        if before is not None:
+            deltas[before] -= 1
+        if after is not None:
+            deltas[after] += 1
+    return deltas
+
+
+def deltas_matching(*criteria):
+    """Variations pour la suppression des tâches vérifiant criteria (à lire avant le DELETE)"""
+    return Counter({
+        (user_id, statut): -total for user_id, statut, total in db.session.execute(
+            select(Task.user_id, Task.statut, func.count()).where(*criteria).group_by(Task.user_id, Task.statut)
+        )
+    })
+
+
+def rebuild_counters():
+    """Recalcule task_counters depuis tasks ; renvoie le nombre de lignes écrites"""
+    db.session.execute(delete(TaskCounter))
+    result = db.session.execute(insert(TaskCounter).from_select(
+        ["user_id", "statut", "total"],
+        select(Task.user_id, Task.statut, func.count()).group_by(Task.user_id, Task.statut)
+    ))
+    db.session.commit()
+    return result.rowcount
+
+
+def _state(task, attribute):
+    """Valeur de attribute avant le flush (None si jamais chargée)"""
+    history = inspect(task).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return (history.unchanged or [None])[0]
+
+
+@event.listens_for(db.session, "before_flush")
+def _count_orm_changes(session, flush_context, instances):
+    if not counters_enabled():
+        return
+    changes = []
+    for task in session.new:
+        if isinstance(task, Task):
+            changes.append((None, (task.user_id, task.statut or 'à faire')))
+    for task in session.deleted:
+        if isinstance(task, Task):
+            changes.append(((_state(task, "user_id"), _state(task, "statut")), None))
+    for task in session.dirty:
+        if isinstance(task, Task) and session.is_modified(task):
+            before = (_state(task, "user_id"), _state(task, "statut"))
+            after = (task.user_id, task.statut)
+            if before != after:
+                changes.append((before, after))
+    if changes:
+        adjust_counters(transition_deltas(changes), session.connection())
@@ -0,0 +1,123 @@
+"""Liste des tokens révoqués, partagée entre les workers gunicorn.
+
+Deux backends sont fournis (TOKEN_BLOCKLIST_BACKEND) :
+
+- "database" (défaut) : table token_blocklist, visible par tous les
+  workers. Chaque entrée porte l'expiration du token et est purgée
+  automatiquement une fois le token expiré.
+- "memory" : dictionnaire local au processus, pour les tests et le
+  développement avec un seul worker.
+
+Dans les deux cas la vérification reste O(1) dans le cas courant : les
+révocations connues du worker sont gardées en mémoire jusqu'à
+l'expiration du token, et les réponses négatives (token valide) sont
+mises en cache TOKEN_BLOCKLIST_NEGATIVE_TTL secondes. Une déconnexion
+faite dans un autre worker est donc prise en compte au plus tard après
+ce délai.
+"""
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from extensions import db
+from models.token_blocklist import RevokedToken
+from utils.ttl_cache import TTLCache
+
+# Expiration supposée des tokens émis sans "exp"
+DEFAULT_TOKEN_LIFETIME = timedelta(days=30)
+
+
+def token_expiry(jwt_payload):
+    """Date d'expiration (UTC naïve) d'un token décodé"""
+    exp = jwt_payload.get("exp")
+    if exp is None:
+        return datetime.utcnow() + DEFAULT_TOKEN_LIFETIME
+    return datetime.utcfromtimestamp(exp)
+
+
+class MemoryBlocklist:
+    """Révocations locales au processus, expirées avec le token"""
+
+    def __init__(self, app=None):
+        self._revoked = TTLCache(maxsize=100000)
+
+    def revoke(self, jti, expires_at):
+        ttl = (expires_at - datetime.utcnow()).total_seconds()
+        if ttl > 0:
+            self._revoked.set(jti, True, ttl=ttl)
+
+    def is_revoked(self, jti):
+        return self._revoked.get(jti, False)
+
+    def purge_expired(self):
+        return 0
+
+
+class DatabaseBlocklist(MemoryBlocklist):
+    """Révocations stockées dans la table token_blocklist"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._not_revoked = TTLCache(
+            ttl=app.config.get("TOKEN_BLOCKLIST_NEGATIVE_TTL", 5),
+            maxsize=100000
+        )
+        self.purge_interval = app.config.get("TOKEN_BLOCKLIST_PURGE_INTERVAL", 600)
+        self._last_purge = 0.0
+
+    def revoke(self, jti, expires_at):
+        db.session.merge(RevokedToken(jti=jti, expires_at=expires_at))
+        db.session.commit()
+        super().revoke(jti, expires_at)
+        self._not_revoked.invalidate(jti)
+
+        if time.monotonic() - self._last_purge > self.purge_interval:
+            self.purge_expired()
+
+    def is_revoked(self, jti):
+        if super().is_revoked(jti):
+            return True
+        if self._not_revoked.get(jti):
+            return False
+
+        row = db.session.get(RevokedToken, jti)
+        if row is not None and row.expires_at > datetime.utcnow():
+            super().revoke(jti, row.expires_at)
+            return True
+        self._not_revoked.set(jti, True)
+        return False
+
+    def purge_expired(self):
+        """Supprime les révocations de tokens déjà expirés"""
+        self._last_purge = time.monotonic()
+        deleted = RevokedToken.query.filter(
+            RevokedToken.expires_at < datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+
+BACKENDS = {
+    "database": DatabaseBlocklist,
+    "memory": MemoryBlocklist,
+}
+
+
+def init_app(app):
+    backend = app.config.get("TOKEN_BLOCKLIST_BACKEND", "database")
+    if backend not in BACKENDS:
+        raise ValueError(f"TOKEN_BLOCKLIST_BACKEND inconnu : {backend}")
+    app.extensions["token_blocklist"] = BACKENDS[backend](app)
+
+
+def get_blocklist():
+    return current_app.extensions["token_blocklist"]
+
+
+def revoke_token(jwt_payload):
+    get_blocklist().revoke(jwt_payload["jti"], token_expiry(jwt_payload))
+
+
+def is_token_revoked(jwt_payload):
+    return get_blocklist().is_revoked(jwt_payload["jti"])
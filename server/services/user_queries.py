@@ -0,0 +1,52 @@
+"""Requêtes de lecture des listes d'utilisateurs (même format que User.to_dict()).
+
+Comme pour les tâches (services/task_queries.py), les listes sélectionnent
+directement les colonnes utiles ; ?fields= restreint le SELECT aux
+champs demandés.
+"""
+from sqlalchemy import select
+
+from extensions import db
+from models.role import Role
+from models.user import User, default_photo_url
+
+# Champ JSON -> colonnes à lire
+USER_FIELD_COLUMNS = {
+    'id': (User.id,),
+    'nom': (User.nom,),
+    'prenom': (User.prenom,),
+    'email': (User.email,),
+    'telephone': (User.telephone,),
+    # La photo par défaut est construite à partir du nom et du prénom
+    'photo_profile': (User.photo_profile, User.prenom, User.nom),
+    'role': (Role.nom.label('role'),),
+    'created_at': (User.created_at,),
+}
+
+USER_FIELDS = tuple(USER_FIELD_COLUMNS)
+
+
+def user_list_select(*criteria, fields=None):
+    """SELECT projeté des utilisateurs avec le nom de leur rôle"""
+    columns = {}
+    for field in fields or USER_FIELDS:
+        for column in USER_FIELD_COLUMNS[field]:
+            columns.setdefault(column.key, column)
+    stmt = select(*columns.values()).select_from(User).outerjoin(Role, Role.id == User.role_id)
+    if criteria:
+        stmt = stmt.where(*criteria)
+    return stmt
+
+
+def user_row_to_dict(row, fields=None):
+    data = {}
+    for field in fields or USER_FIELDS:
+        if field == 'photo_profile':
+            data[field] = row['photo_profile'] or default_photo_url(row['prenom'], row['nom'])
+        else:
+            data[field] = row[field]
+    return data
+
+
+def fetch_user_dicts(stmt, fields=None):
+    return [user_row_to_dict(row, fields) for row in db.session.execute(stmt).mappings()]
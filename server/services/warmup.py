@@ -0,0 +1,107 @@
+"""Préchauffage du worker et sonde de disponibilité /healthz.
+
+Après un démarrage à froid (service mis en veille par Render), la
+première requête paie en plus : la configuration des mappers SQLAlchemy,
+l'ouverture des connexions du pool et la compilation des requêtes les
+plus fréquentes (cache de compilation du moteur). warm_up() fait ce
+travail une fois par worker : au démarrage du worker sous gunicorn
+(WARMUP_ON_START, voir gunicorn.conf.py) ou, à défaut, au premier appel
+de /healthz.
+
+/healthz répond 200 une fois le worker préchauffé et la base joignable
+(SELECT 1 ensuite), 503 sinon : Render n'envoie le trafic qu'à ce moment.
+"""
+import logging
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import configure_mappers
+
+from extensions import db
+from models.task import Task
+from services.identity import get_user_entry
+from services.query_budget import query_budget
+from services.task_queries import fetch_task_dicts, task_list_select
+from services.token_blocklist import get_blocklist
+from utils.http_cache import task_list_state_select
+from utils.pagination import DEFAULT_LIMIT, paginate_tasks, sort_order
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+def _warm_pool(count):
+    """Ouvre count connexions en même temps puis les rend au pool, qui les garde ouvertes"""
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(db.engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def _warm_queries():
+    # Requêtes des routes les plus appelées, sur des identifiants inexistants :
+    # compilées et mises en cache par le moteur, sans rien lire
+    get_blocklist().is_revoked("")
+    get_user_entry(user_id=0)
+    criteria = (Task.user_id == 0,)
+    db.session.execute(task_list_state_select(*criteria, with_users=True)).one()
+    fetch_task_dicts(task_list_select(*criteria).order_by(*sort_order()))
+    paginate_tasks(task_list_select(*criteria), DEFAULT_LIMIT)
+    db.session.rollback()
+
+
+def warm_up(app):
+    """Préchauffe le worker (une seule fois) ; renvoie la durée de chaque étape en ms"""
+    with _lock:
+        report = app.extensions.get("warmup")
+        if report is not None:
+            return report
+        report = {}
+        for step, run in (
+            ("mappers", configure_mappers),
+            ("pool", lambda: _warm_pool(app.config.get("WARMUP_POOL_CONNECTIONS", 2))),
+            ("queries", _warm_queries),
+        ):
+            start = time.perf_counter()
+            run()
+            report[step] = round((time.perf_counter() - start) * 1000, 2)
+        app.extensions["warmup"] = report
+        logger.info("Worker préchauffé", extra={"warmup_ms": report})
+        return report
+
+
+def warm_up_on_start(app):
+    """Préchauffage au démarrage du worker ; base injoignable : /healthz réessaiera"""
+    if not app.config.get("WARMUP_ON_START", True):
+        return
+    with app.app_context():
+        try:
+            warm_up(app)
+        except SQLAlchemyError:
+            logger.warning("Préchauffage impossible au démarrage", exc_info=True)
+
+
+@query_budget(5)
+def healthz_view():
+    app = current_app._get_current_object()
+    try:
+        report = app.extensions.get("warmup")
+        if report is None:
+            report = warm_up(app)
+        else:
+            db.session.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        logger.warning("Sonde /healthz en échec", exc_info=True)
+        return {"error": "Service indisponible", "message": "Base de données injoignable"}, 503
+    return {"status": "ok", "warmup_ms": report}, 200
+
+
+def init_app(app):
+    app.add_url_rule("/healthz", "healthz", healthz_view)
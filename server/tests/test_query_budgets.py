@@ -0,0 +1,37 @@
+"""Budgets de requêtes SQL par route (@query_budget), via le scénario de scripts/check_query_budgets.py.
+
+Chaque route de auth_bp et task_bp est un cas de test : tous ses appels du
+scénario, sur une petite et une grande base, doivent réussir, tenir dans
+son budget et faire le même nombre de requêtes aux deux tailles (N+1).
+"""
+import pytest
+
+from app import create_app
+from scripts.check_query_budgets import BLUEPRINTS, check, run
+
+ENDPOINTS = sorted(
+    rule.endpoint for rule in create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).url_map.iter_rules()
+    if rule.endpoint.split(".")[0] in BLUEPRINTS
+)
+
+
+@pytest.fixture(scope="module")
+def budget_runs():
+    small, endpoints = run(5, 60)
+    large, _ = run(20, 600)
+    return small, large, endpoints
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_route_within_query_budget(budget_runs, endpoint):
+    small, large, _ = budget_runs
+    calls = [index for index, result in enumerate(small) if result[1] == endpoint]
+    assert calls, f"{endpoint} : route non couverte par le scénario"
+    failures = check([small[index] for index in calls], [large[index] for index in calls], set())
+    assert not failures, "\n".join(failures)
+
+
+def test_every_route_covered(budget_runs):
+    small, _, endpoints = budget_runs
+    assert endpoints == set(ENDPOINTS)
+    assert check(*budget_runs) == []
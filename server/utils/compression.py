@@ -0,0 +1,66 @@
+"""Compression gzip / brotli des réponses, négociée sur Accept-Encoding.
+
+Seules les réponses JSON ou texte au-dessus de COMPRESS_MIN_SIZE octets
+sont compressées ; les flux (SSE), les 304 et les réponses déjà encodées
+sont laissés tels quels. brotli est optionnel : sans le module, seul
+gzip est proposé.
+"""
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/plain", "text/csv"}
+
+
+def _gzip(data, app):
+    return gzip.compress(data, compresslevel=app.config.get("COMPRESS_LEVEL", 6))
+
+
+def _brotli(data, app):
+    return brotli.compress(data, quality=app.config.get("COMPRESS_BROTLI_QUALITY", 4))
+
+
+ENCODERS = {"gzip": _gzip}
+if brotli is not None:
+    ENCODERS["br"] = _brotli
+
+
+def supported_encodings(app):
+    """Encodages activés par COMPRESS_ALGORITHMS, dans l'ordre de préférence du serveur"""
+    wanted = [name.strip() for name in app.config.get("COMPRESS_ALGORITHMS", "br,gzip").split(",")]
+    return [name for name in wanted if name in ENCODERS]
+
+
+def compress_response(response, app):
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or response.is_streamed or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    encodings = supported_encodings(app)
+    if not encodings:
+        return response
+    response.vary.add("Accept-Encoding")
+
+    data = response.get_data()
+    if len(data) < app.config.get("COMPRESS_MIN_SIZE", 1024):
+        return response
+    encoding = request.accept_encodings.best_match(encodings)
+    if encoding is None:
+        return response
+
+    response.set_data(ENCODERS[encoding](data, app))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_app(app):
+    @app.after_request
+    def _compress(response):
+        return compress_response(response, app)
@@ -0,0 +1,25 @@
+"""Paramètres ?fields= (sous-ensemble de champs) et ?compact= des listes."""
+
+
+class InvalidFields(ValueError):
+    """Paramètre fields invalide"""
+
+
+def parse_fields(args, allowed):
+    """Champs demandés par ?fields=a,b,c (dans l'ordre de allowed), ou None pour tous"""
+    raw = args.get("fields")
+    if raw is None:
+        return None
+    fields = {field.strip() for field in raw.split(",") if field.strip()}
+    if not fields:
+        raise InvalidFields("fields ne peut pas être vide")
+    unknown = fields - set(allowed)
+    if unknown:
+        raise InvalidFields(f"Champs inconnus : {', '.join(sorted(unknown))} "
+                            f"(disponibles : {', '.join(allowed)})")
+    return tuple(field for field in allowed if field in fields)
+
+
+def parse_compact(args):
+    """?compact=1 : utilisateurs regroupés dans une table "users" au lieu d'être répétés"""
+    return args.get("compact", "").lower() in ("1", "true", "yes")
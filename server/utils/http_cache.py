@@ -0,0 +1,91 @@
+"""ETag et GET conditionnels pour les listes de tâches et le profil.
+
+La version d'une liste est calculée par une seule requête d'agrégat
+(nombre de lignes, max(updated_at), max(id)) sur le périmètre demandé,
+plus max(users.updated_at) quand la réponse inclut l'utilisateur assigné
+(nom, prénom, email) : si le client renvoie le même ETag (If-None-Match),
+on répond 304 avant de charger ou sérialiser la moindre tâche.
+
+Quand la dernière modification date de moins de ETAG_RACY_WINDOW
+secondes, aucun ETag n'est émis : avec des colonnes DATETIME à la
+seconde (MySQL), deux écritures dans la même seconde donneraient sinon
+la même version.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt
+from sqlalchemy import func, select
+
+from extensions import db
+from models.task import Task
+from models.user import User
+
+# À incrémenter quand le format JSON des réponses change
+PAYLOAD_VERSION = "1"
+
+
+def _etag(*parts):
+    raw = "|".join(str(part) for part in (PAYLOAD_VERSION, get_jwt().get("sub"), *parts))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def task_list_state_select(*criteria, with_users=False):
+    """Agrégat (nombre, dernière modification, plus grand id) de la liste filtrée par criteria
+
+    with_users ajoute la dernière modification de la table users (sous-requête
+    scalaire : la table est petite, et le profil d'un utilisateur peut changer
+    sans qu'aucune de ses tâches ne change).
+    """
+    columns = [func.count(Task.id), func.max(Task.updated_at), func.max(Task.id)]
+    if with_users:
+        columns.append(select(func.max(User.updated_at)).scalar_subquery())
+    return select(*columns).where(*criteria)
+
+
+def task_list_state(*criteria, with_users=True):
+    """(ETag, nombre de tâches) de la liste filtrée par criteria ; ETag None si non cacheable"""
+    count, last_update, last_id, *users_update = db.session.execute(
+        task_list_state_select(*criteria, with_users=with_users)
+    ).one()
+
+    racy_window = timedelta(seconds=current_app.config.get("ETAG_RACY_WINDOW", 1))
+    updates = [update for update in (last_update, *users_update) if update is not None]
+    if updates and datetime.utcnow() - max(updates) < racy_window:
+        return None, count
+
+    return _etag(request.path, request.query_string.decode("utf-8"), count,
+                 *(update.isoformat() if update else "" for update in (last_update, *users_update)),
+                 last_id or ""), count
+
+
+def payload_etag(payload):
+    """ETag d'un petit document déjà en mémoire (profil en cache, par exemple)"""
+    return _etag(request.path, json.dumps(payload, sort_keys=True, default=str))
+
+
+def json_with_etag(payload):
+    """Réponse JSON d'un document avec ETag (304 si le client l'a déjà)"""
+    etag = payload_etag(payload)
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+    return with_etag(jsonify(payload), etag), 200
+
+
+def is_not_modified(etag):
+    return etag is not None and request.if_none_match.contains_weak(etag)
+
+
+def not_modified_response(etag):
+    return with_etag(make_response("", 304), etag)
+
+
+def with_etag(response, etag):
+    """Ajoute l'ETag et impose la revalidation à chaque affichage (cache privé)"""
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+        response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Authorization")
+    return response
@@ -0,0 +1,71 @@
+"""Encodage JSON des réponses : orjson si installé, sinon la bibliothèque standard.
+
+Les sérialiseurs (to_dict, task_row_to_dict) renvoient les dates telles
+quelles ; les deux backends les écrivent au format ISO 8601 (le
+fournisseur par défaut de Flask produirait une date HTTP). Les clés ne
+sont pas triées : l'ordre des dicts est déjà stable et le tri coûte cher
+sur les grandes listes.
+"""
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Module json standard, dates en ISO 8601"""
+    default = staticmethod(_default)
+    sort_keys = False
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """orjson : encodage en C, datetimes natifs, corps produit directement en bytes"""
+
+    def _options(self):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Options propres au module json (indent, ensure_ascii...) : chemin standard
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options())
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+BACKENDS = {
+    "orjson": OrjsonProvider,
+    "stdlib": StdlibJSONProvider,
+}
+
+
+def init_app(app):
+    backend = app.config.get("JSON_BACKEND", "auto")
+    if backend == "auto":
+        backend = "orjson" if orjson is not None else "stdlib"
+    if backend not in BACKENDS:
+        raise ValueError(f"JSON_BACKEND inconnu : {backend}")
+    if backend == "orjson" and orjson is None:
+        raise ValueError("JSON_BACKEND=orjson mais orjson n'est pas installé")
+    app.json = BACKENDS[backend](app)
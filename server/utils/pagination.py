@@ -0,0 +1,128 @@
+"""Pagination par curseur (keyset) sur le couple (clé de tri, id).
+
+Le curseur est opaque pour le client : c'est la position de la dernière
+tâche renvoyée, encodée en base64. La page suivante reprend strictement
+après cette position, ce qui garde un coût constant quelle que soit la
+profondeur de la page (pas d'OFFSET).
+
+Le tri (?sort=) est choisi parmi SORTS, colonnes indexées ("-" :
+décroissant). Le curseur retient le tri qui l'a produit : il est refusé
+avec un autre tri.
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+from extensions import db
+from models.task import Task
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# ?sort= -> colonne de tri (id départage les égalités dans le même sens)
+SORTS = {
+    "created_at": Task.created_at,
+    "updated_at": Task.updated_at,
+}
+DEFAULT_SORT = "-created_at"
+
+
+class InvalidPagination(ValueError):
+    """Paramètres limit/cursor/sort invalides"""
+
+
+def parse_sort(args):
+    """Tri demandé (?sort=created_at, -updated_at...), DEFAULT_SORT par défaut"""
+    sort = args.get("sort", DEFAULT_SORT)
+    if sort.lstrip("-") not in SORTS:
+        raise InvalidPagination(f"sort doit être l'un de : {', '.join(f'{k}, -{k}' for k in SORTS)}")
+    return sort
+
+
+def _sort_column(sort):
+    return SORTS[sort.lstrip("-")], sort.startswith("-")
+
+
+def sort_order(sort=DEFAULT_SORT):
+    """Clauses ORDER BY du tri"""
+    column, descending = _sort_column(sort)
+    if descending:
+        return column.desc(), Task.id.desc()
+    return column.asc(), Task.id.asc()
+
+
+def encode_cursor(value, task_id, sort=DEFAULT_SORT):
+    position = [value.isoformat() if value else None, task_id]
+    # Tri par défaut : même format qu'avant l'ajout de ?sort=
+    if sort != DEFAULT_SORT:
+        position.append(sort)
+    payload = json.dumps(position)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort=DEFAULT_SORT):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value, task_id = position[:2]
+        cursor_sort = position[2] if len(position) > 2 else DEFAULT_SORT
+        position = (datetime.fromisoformat(value) if value else None), int(task_id)
+    except (ValueError, TypeError, IndexError):
+        raise InvalidPagination("Curseur invalide")
+    if cursor_sort != sort:
+        raise InvalidPagination("Curseur obtenu avec un autre tri")
+    return position
+
+
+def parse_pagination_args(args, sort=DEFAULT_SORT):
+    """Lit limit/cursor dans la query string.
+
+    Renvoie None si le client n'a demandé aucune pagination (ancien format :
+    liste complète), sinon un tuple (limit, position) où position vaut None
+    pour la première page.
+    """
+    limit = args.get("limit")
+    cursor = args.get("cursor")
+    if limit is None and cursor is None:
+        return None
+
+    if limit is None:
+        limit = DEFAULT_LIMIT
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidPagination("limit doit être un entier")
+        if not 1 <= limit <= MAX_LIMIT:
+            raise InvalidPagination(f"limit doit être compris entre 1 et {MAX_LIMIT}")
+
+    position = decode_cursor(cursor, sort) if cursor else None
+    return limit, position
+
+
+def paginate_tasks(stmt, limit, position=None, sort=DEFAULT_SORT):
+    """Renvoie (lignes, next_cursor) pour un SELECT de tâches non trié.
+
+    Le SELECT doit exposer la colonne id de la tâche.
+    """
+    column, descending = _sort_column(sort)
+    if position is not None:
+        value, task_id = position
+        if descending:
+            stmt = stmt.where(or_(column < value, and_(column == value, Task.id < task_id)))
+        else:
+            stmt = stmt.where(or_(column > value, and_(column == value, Task.id > task_id)))
+
+    # Une ligne de plus que demandé pour savoir s'il existe une page suivante ;
+    # sort_key : valeur de tri même si ?fields= ne la demande pas
+    stmt = stmt.add_columns(column.label("sort_key")).order_by(*sort_order(sort)).limit(limit + 1)
+    rows = db.session.execute(stmt).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["sort_key"], last["id"], sort)
+    return rows, next_cursor
@@ -0,0 +1,38 @@
+"""Session SQLAlchemy qui envoie les lectures des requêtes GET vers le réplica.
+
+Le choix est fait requête par requête (g.db_read_replica, posé par
+services/replica.py) puis instruction par instruction : toute écriture
+(INSERT/UPDATE/DELETE, flush) va au primaire, et une fois qu'une écriture
+a eu lieu, la session reste sur le primaire pour relire ce qu'elle vient
+d'écrire. Les tables de PRIMARY_TABLES sont toujours lues sur le primaire.
+"""
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = "replica"
+
+# Lectures qui ne tolèrent pas de retard de réplication : révocation d'un
+# token juste après la déconnexion, flux d'événements temps réel, suppressions
+# vues par la synchronisation (les tâches de ?since= : voir services/sync.py)
+PRIMARY_TABLES = {"token_blocklist", "task_events", "task_tombstones"}
+
+_WROTE_KEY = "routing_wrote"
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica(mapper, clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_replica(self, mapper, clause):
+        if not (has_request_context() and g.get("db_read_replica")):
+            return False
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info[_WROTE_KEY] = True
+            return False
+        if self.info.get(_WROTE_KEY):
+            return False
+        table = getattr(mapper, "local_table", None)
+        return table is None or table.name not in PRIMARY_TABLES
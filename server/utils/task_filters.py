@@ -0,0 +1,91 @@
+"""Filtres des listes de tâches, traduits en critères SQL.
+
+Paramètres combinables (tous optionnels) :
+- statut : un ou plusieurs statuts (?statut=à faire&statut=en cours ou
+  ?statut=à faire,en cours) ;
+- user_id, assigned_by_id : identifiant ;
+- valide_par_admin : true/false ;
+- created_after, created_before, validated_after, validated_before : date
+  ou date-heure ISO 8601 (UTC si sans fuseau), bornes "after" incluses,
+  "before" exclues.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import or_
+
+from models.task import STATUTS, Task
+
+FILTER_PARAMS = (
+    "statut", "user_id", "assigned_by_id", "valide_par_admin",
+    "created_after", "created_before", "validated_after", "validated_before",
+)
+
+_BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+
+class InvalidFilters(ValueError):
+    """Filtre inconnu ou valeur invalide"""
+
+
+def has_filters(args):
+    return any(name in args for name in FILTER_PARAMS)
+
+
+def _int(args, name):
+    try:
+        return int(args[name])
+    except ValueError:
+        raise InvalidFilters(f"{name} doit être un entier")
+
+
+def _datetime(args, name):
+    try:
+        value = datetime.fromisoformat(args[name])
+    except ValueError:
+        raise InvalidFilters(f"{name} doit être une date ISO 8601 (AAAA-MM-JJ ou AAAA-MM-JJTHH:MM:SS)")
+    # Les dates sont stockées en UTC naïf
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_task_filters(args, allow_user_id=True, model=Task):
+    """Critères SQL des filtres présents dans args (liste vide si aucun).
+
+    allow_user_id=False pour les listes déjà limitées à un utilisateur ;
+    model=TaskArchive pour filtrer l'archive (mêmes colonnes).
+    """
+    criteria = []
+
+    statuts = [value.strip() for raw in args.getlist("statut") for value in raw.split(",") if value.strip()]
+    if statuts:
+        unknown = sorted(set(statuts) - set(STATUTS))
+        if unknown:
+            raise InvalidFilters(f"Statut(s) inconnu(s) : {', '.join(unknown)} (disponibles : {', '.join(STATUTS)})")
+        criteria.append(model.statut.in_(sorted(set(statuts))))
+
+    if "user_id" in args:
+        if not allow_user_id:
+            raise InvalidFilters("user_id ne s'applique pas à cette liste")
+        criteria.append(model.user_id == _int(args, "user_id"))
+    if "assigned_by_id" in args:
+        criteria.append(model.assigned_by_id == _int(args, "assigned_by_id"))
+
+    if "valide_par_admin" in args:
+        value = _BOOLEANS.get(args["valide_par_admin"].lower())
+        if value is None:
+            raise InvalidFilters("valide_par_admin doit valoir true ou false")
+        # Colonne nullable : une tâche jamais validée peut valoir NULL
+        criteria.append(model.valide_par_admin == True if value
+                        else or_(model.valide_par_admin == False, model.valide_par_admin.is_(None)))
+
+    for name, column, after in (
+        ("created_after", model.created_at, True),
+        ("created_before", model.created_at, False),
+        ("validated_after", model.date_validation, True),
+        ("validated_before", model.date_validation, False),
+    ):
+        if name in args:
+            value = _datetime(args, name)
+            criteria.append(column >= value if after else column < value)
+    return criteria
@@ -0,0 +1,56 @@
+"""Petit cache mémoire à durée de vie, local au processus (worker gunicorn)."""
+import threading
+import time
+
+
+class TTLCache:
+    """Dictionnaire thread-safe dont les entrées expirent après ttl secondes.
+
+    Quand maxsize est atteint, les entrées expirées sont purgées puis, si
+    besoin, les plus anciennes sont évincées.
+    """
+
+    def __init__(self, ttl=300, maxsize=10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            with self._lock:
+                self._data.pop(key, None)
+            return default
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                self._evict()
+            self._data[key] = (expires_at, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at < now]:
+            del self._data[key]
+        # Toujours plein : on retire le dixième le plus proche de l'expiration
+        if len(self._data) >= self.maxsize:
+            oldest = sorted(self._data, key=lambda k: self._data[k][0])
+            for key in oldest[:max(1, self.maxsize // 10)]:
+                del self._data[key]